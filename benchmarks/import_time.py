@@ -0,0 +1,80 @@
+"""
+Cold-start import budget for the Streamlit entry point.
+
+Runs ``python -X importtime -c "import main"`` in a fresh interpreter and
+fails (exit code 1) if the cumulative import time of ``main`` exceeds the
+budget, or if a module that should be lazily loaded is imported eagerly.
+
+Usage:
+    python benchmarks/import_time.py [--budget-ms 1500] [--runs 3]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")
+DEFAULT_BUDGET_MS = float(os.getenv("NOVARA_IMPORT_BUDGET_MS", 1500))
+LAZY_MODULES = [
+    "google.generativeai",
+    "app.ui_components.movie_details",
+    "app.ui_components.anime_details",
+    "app.ui_components.watchlist_display",
+    "app.clients.unified",
+    "app.clients.aio",
+    "httpx",
+    "app.utils.recommender",
+]
+
+
+def measure() -> tuple:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"Importing main failed:\n{result.stderr}")
+
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [part.strip() for part in line[len("import time:") :].split("|")]
+        if parts[1].isdigit():
+            cumulative[parts[2].strip()] = int(parts[1])
+    return cumulative.get("main", 0) / 1000, set(cumulative)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    timings = []
+    modules = set()
+    for _ in range(args.runs):
+        elapsed_ms, modules = measure()
+        timings.append(elapsed_ms)
+
+    best = min(timings)
+    print(
+        f"import main: best {best:.0f} ms over {args.runs} runs "
+        f"(budget {args.budget_ms:.0f} ms)"
+    )
+
+    eager = [name for name in LAZY_MODULES if name in modules]
+    if eager:
+        print(f"FAIL: imported eagerly: {', '.join(eager)}")
+    if best > args.budget_ms:
+        print("FAIL: cold start is over budget")
+    if eager or best > args.budget_ms:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Interactivity benchmark for watchlist "For You" recommendations.
+
+Builds a synthetic candidate pool and watchlist, then times the operations a
+rerun actually performs: adding/removing a watchlist item (incremental taste
+vector update), scoring the whole pool, and scoring right after a new title
+has been indexed. Fails (exit code 1) if any of them is over budget.
+
+Usage:
+    python benchmarks/recommendations.py [--watchlist 10000] [--candidates 100000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from app.utils.recommender import (  # noqa: E402
+    ContentIndex,
+    TasteProfile,
+    movie_features,
+)
+
+DEFAULT_BUDGET_MS = float(os.getenv("NOVARA_RECOMMEND_BUDGET_MS", 250))
+GENRES = ["Action", "Comedy", "Drama", "Sci-Fi", "Romance", "Horror", "Fantasy"]
+VOCABULARY = [f"word{i}" for i in range(20000)]
+
+
+def fake_movie(rng: random.Random, number: int) -> dict:
+    return {
+        "imdbID": f"tt{number:08d}",
+        "Title": f"Title {number}",
+        "Plot": " ".join(rng.choices(VOCABULARY, k=40)),
+        "Genre": ", ".join(rng.sample(GENRES, 2)),
+        "Year": str(rng.randint(1960, 2025)),
+        "imdbRating": f"{rng.uniform(3, 9.5):.1f}",
+    }
+
+
+def best_ms(fn, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--watchlist", type=int, default=10_000)
+    parser.add_argument("--candidates", type=int, default=100_000)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    pool = args.candidates + args.runs
+    index = ContentIndex(capacity=pool, max_rows=pool)
+    for number in range(args.candidates):
+        index.add_movie(fake_movie(rng, number))
+
+    profile = TasteProfile()
+    watchlist = [fake_movie(rng, args.candidates + n) for n in range(args.watchlist)]
+    for movie in watchlist:
+        profile.add("movie", movie["imdbID"], movie_features(movie))
+
+    extra = fake_movie(rng, args.candidates + args.watchlist)
+    extra_features = movie_features(extra)
+
+    def add_and_remove():
+        profile.add("movie", extra["imdbID"], extra_features)
+        profile.remove("movie", extra["imdbID"])
+
+    fresh_titles = iter(range(10**9, 10**9 + args.runs))
+
+    def index_and_score():
+        # A newly fetched title invalidates the cached idf weights.
+        index.add_movie(fake_movie(rng, next(fresh_titles)))
+        index.recommend(profile, 6)
+
+    def rebuild():
+        fresh = TasteProfile()
+        for movie in watchlist:
+            fresh.add("movie", movie["imdbID"], movie_features(movie))
+
+    results = {
+        "add+remove item": best_ms(add_and_remove, args.runs),
+        "score candidates": best_ms(lambda: index.recommend(profile, 6), args.runs),
+        "index title + score": best_ms(index_and_score, args.runs),
+    }
+    rebuild_ms = best_ms(rebuild, 1)
+
+    print(f"watchlist {args.watchlist:,} items, pool {args.candidates:,} candidates")
+    for name, elapsed in results.items():
+        print(f"  {name}: {elapsed:.2f} ms")
+    print(f"  (full rebuild for comparison: {rebuild_ms:.0f} ms)")
+
+    over = [name for name, elapsed in results.items() if elapsed > args.budget_ms]
+    if over:
+        print(f"FAIL: over the {args.budget_ms:.0f} ms budget: {', '.join(over)}")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
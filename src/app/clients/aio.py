@@ -0,0 +1,163 @@
+import asyncio
+import threading
+import weakref
+from concurrent.futures import Future
+from typing import Awaitable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.clients import jikan, omdb
+from app.utils.cache import load_once_async
+from app.utils.ratelimit import backoff_delay
+
+MAX_CONNECTIONS = 32
+PER_HOST_LIMITS = {"www.omdbapi.com": 8, "api.jikan.moe": 3}
+DEFAULT_HOST_LIMIT = 4
+
+
+class AsyncHTTP:
+    def __init__(self):
+        self.client = httpx.AsyncClient(
+            timeout=10,
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_CONNECTIONS,
+            ),
+        )
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    async def get(self, url: str, params: Optional[Dict] = None) -> httpx.Response:
+        host = urlsplit(url).hostname
+        semaphore = self._host_limits.get(host)
+        if semaphore is None:
+            limit = PER_HOST_LIMITS.get(host, DEFAULT_HOST_LIMIT)
+            semaphore = self._host_limits[host] = asyncio.Semaphore(limit)
+        async with semaphore:
+            return await self.client.get(url, params=params)
+
+
+# httpx clients and semaphores are bound to the loop that created them, so
+# the pool is kept per event loop.
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncHTTP]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_http() -> AsyncHTTP:
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = _pools[loop] = AsyncHTTP()
+    return pool
+
+
+async def _blocking(fn, *args):
+    # Cache writes (SQLite/file) and the on_details hook block, so they run
+    # in the loop's executor.
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+
+# The async clients wrap a sync client and reuse its cache, single-flight,
+# request params, response handling and on_details hook; only the transport
+# differs. They raise on failure and never touch st.*, since they run on the
+# background loop thread.
+class AsyncOMDBClient:
+    def __init__(self, client: "omdb.OMDBClient"):
+        self.client = client
+
+    async def search_page(self, query: str, page: int = 1) -> Dict:
+        client = self.client
+        key = omdb.page_key(query, page)
+
+        async def fetch():
+            response = await get_http().get(
+                omdb.OMDB_URL, params=client.page_params(query, page)
+            )
+            return await _blocking(client.store_page, key, response)
+
+        return await load_once_async(client.cache, client.flight, key, fetch)
+
+    async def search(self, query: str) -> List[Dict]:
+        return (await self.search_page(query))["results"]
+
+    async def details(self, imdb_id: str) -> Dict:
+        client = self.client
+        key = omdb.details_key(imdb_id)
+
+        async def fetch():
+            response = await get_http().get(
+                omdb.OMDB_URL, params=client.details_params(imdb_id)
+            )
+            return await _blocking(client.store_details, key, response)
+
+        data = await load_once_async(client.cache, client.flight, key, fetch)
+        await _blocking(client.publish, data)
+        return data
+
+
+class AsyncJikanClient:
+    def __init__(self, client: "jikan.JikanClient"):
+        self.client = client
+
+    async def _get(self, url: str, params: Optional[Dict] = None) -> httpx.Response:
+        limiter = self.client.limiter
+        for attempt in range(jikan.MAX_RETRIES + 1):
+            # The limiter is shared with the sync client and blocks, so it
+            # waits in a worker thread instead of stalling the event loop.
+            await _blocking(limiter.acquire)
+            response = await get_http().get(url, params=params)
+            if response.status_code != 429 or attempt == jikan.MAX_RETRIES:
+                return response
+
+            delay = backoff_delay(attempt, response.headers.get("Retry-After"))
+            limiter.penalize(delay)
+            await asyncio.sleep(delay)
+        return response
+
+    async def search(self, query: str) -> List[Dict]:
+        client = self.client
+        key = jikan.search_key(query)
+
+        async def fetch():
+            response = await self._get(
+                f"{jikan.JIKAN_URL}/anime", params=jikan.search_params(query)
+            )
+            return await _blocking(client.store_search_response, key, response)
+
+        results = await load_once_async(client.cache, client.flight, key, fetch)
+        await _blocking(client.publish, results)
+        return results
+
+    async def details(self, anime_id: str) -> Optional[Dict]:
+        client = self.client
+        key = jikan.details_key(anime_id)
+
+        async def fetch():
+            response = await self._get(f"{jikan.JIKAN_URL}/anime/{key[1]}")
+            return await _blocking(client.store_details, key, response)
+
+        data = await load_once_async(client.cache, client.flight, key, fetch)
+        await _blocking(client.publish, [data])
+        return data
+
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_loop.run_forever, name="novara-aio", daemon=True
+            ).start()
+        return _loop
+
+
+def submit(coro: Awaitable) -> Future:
+    # Schedules coro on the shared background loop. Cancelling the returned
+    # future cancels the task.
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop())
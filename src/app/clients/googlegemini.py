@@ -1,82 +1,378 @@
+import hashlib
+import json
 import os
+import re
 import streamlit as st
-import google.generativeai as genai
-from typing import List
+from collections import OrderedDict
+from typing import Dict, Iterator, List
+from app.utils.cache import MISSING, get_cache
+from app.utils.chat_budget import TokenBudget, format_transcript, turn_report
+from app.utils.scheduler import PriorityScheduler, QuotaExceeded, SchedulerBusy
+
+GENERATION_TTL = 24 * 60 * 60
+MODEL_NAME = "gemini-1.5-flash"
+CHAT_POOL_SIZE = 8
+CHAT_CONTEXT_PROMPT = """You are a knowledgeable movie expert discussing "{context}".
+Answer questions about this movie in a conversational, engaging way.
+Keep responses concise but informative. You can discuss plot, themes, characters,
+production details, and recommendations."""
+CHAT_CONTEXT_REPLY = "Got it! Ask me anything about this title."
+CHAT_SUMMARY_PROMPT = """Update the running summary of a chat about a movie or anime.
+Keep names, opinions and open questions the user cares about; drop small talk.
+Answer with the updated summary only, in at most 120 words.
+
+Current summary: {summary}
+
+New conversation turns:
+{transcript}"""
+
+# Bump a template's version whenever its wording changes so cached answers
+# for the old prompt are no longer served.
+PROMPTS = {
+    "similar": (
+        1,
+        "Recommend 5 similar movies/shows to '{title}' (Genre: {genre}) for mood '{mood}'. Give each with one-line reason. Format as numbered list.",
+    ),
+    "insights": (
+        1,
+        """You are helping someone decide whether to watch '{title}' (Genre: {genre}).
+Plot: {plot}
+
+Respond with a JSON object with exactly these keys:
+- "summary": the plot in exactly 2 sentences without spoilers, written to convince me to watch it in the most human way possible.
+- "why_watch": one persuasive sentence to convince a 20-35 year old to watch it.
+- "recommendations": a list of 5 objects {{"title": ..., "reason": ...}} naming similar movies/shows, each with a one-line reason.""",
+    ),
+    "rerank": (
+        1,
+        """Someone enjoyed '{title}' (Genre: {genre}).
+Order these candidates from the best to the worst recommendation for them:
+{candidates}
+
+Respond with a JSON list of the candidate numbers only, best first.""",
+    ),
+}
+PROMPT_TTLS = {
+    "similar": GENERATION_TTL,
+    "insights": 7 * 24 * 60 * 60,
+    "rerank": GENERATION_TTL,
+}
+INSIGHT_RECOMMENDATIONS = 5
+
+# One scheduler per process: caps concurrent Gemini calls, serves chat before
+# why-watch/summary/similar, and rate-limits each browser session.
+_scheduler = PriorityScheduler(max_concurrency=4)
+
+
+def prompt_key(template: str, inputs: Dict[str, str]) -> str:
+    version, _ = PROMPTS[template]
+    payload = {
+        "model": MODEL_NAME,
+        "template": template,
+        "version": version,
+        "inputs": {
+            name: " ".join(str(value).split()) for name, value in inputs.items()
+        },
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def describe_item(item: Dict) -> Dict[str, str]:
+    if "Title" in item:
+        return {
+            "title": item.get("Title", ""),
+            "plot": item.get("Plot", ""),
+            "genre": item.get("Genre", ""),
+        }
+    return {
+        "title": item.get("title", ""),
+        "plot": item.get("synopsis") or "",
+        "genre": ", ".join(genre["name"] for genre in item.get("genres", [])),
+    }
+
+
+def parse_insights(text: str) -> Dict:
+    data = json.loads(text)
+    summary = data.get("summary")
+    why_watch = data.get("why_watch")
+    if not isinstance(summary, str) or not isinstance(why_watch, str):
+        raise ValueError("response is missing 'summary' or 'why_watch'")
+
+    recommendations = []
+    for rec in data.get("recommendations") or []:
+        if isinstance(rec, dict) and str(rec.get("title", "")).strip():
+            recommendations.append(
+                {
+                    "title": str(rec["title"]).strip(),
+                    "reason": str(rec.get("reason", "")).strip(),
+                }
+            )
+    if not recommendations:
+        raise ValueError("response has no recommendations")
+
+    return {
+        "summary": summary.strip(),
+        "why_watch": why_watch.strip(),
+        "recommendations": recommendations[:INSIGHT_RECOMMENDATIONS],
+    }
+
+
+_NUMBERED_LINE = re.compile(r"^\s*\d+[.)]\s*(?P<body>.+)$")
+_TITLE_AND_REASON = re.compile(
+    r"^\**\s*(?P<title>.+?)\s*\**\s*(?:\((?P<year>\d{4})[^)]*\))?\s*\**\s*"
+    r"(?:[-–—:]\s*(?P<reason>.*))?$"
+)
+
+
+def parse_recommendation_lines(lines: List[str]) -> List[Dict]:
+    recommendations = []
+    for line in lines:
+        numbered = _NUMBERED_LINE.match(line)
+        if not numbered:
+            continue
+        match = _TITLE_AND_REASON.match(numbered.group("body").strip())
+        title = match.group("title").strip("*\"' ") if match else ""
+        if title:
+            recommendations.append(
+                {"title": title, "reason": (match.group("reason") or "").strip()}
+            )
+    return recommendations[:INSIGHT_RECOMMENDATIONS]
+
+
+def parse_ranking(text: str, count: int) -> List[int]:
+    order = []
+    for number in re.findall(r"\d+", text):
+        index = int(number) - 1
+        if 0 <= index < count and index not in order:
+            order.append(index)
+    # Anything the model left out keeps its original relative order.
+    return order + [index for index in range(count) if index not in order]
+
+
+def create_model():
+    # The SDK pulls in grpc/protobuf and dominates cold start, so it is only
+    # imported once a page actually needs Gemini.
+    import google.generativeai as genai
+
+    genai.configure(api_key=os.getenv("GOOGLE_GEMINI_API_KEY"))
+    return genai.GenerativeModel(MODEL_NAME)
+
+
+class ChatState:
+    def __init__(self, context: str):
+        self.context = context
+        self.summary = ""
+        self.session = None
+        self.turns: List[Dict] = []
 
 
 class GeminiAI:
-    def __init__(self):
+    def __init__(self, model=None, session_id: str = "anonymous", scheduler=None):
+        # Set up front so a client without a model still answers has_chat()
+        # and chat_turns().
+        self.session_id = session_id
+        self.scheduler = scheduler or _scheduler
+        self.chats: "OrderedDict[str, ChatState]" = OrderedDict()
+        self.budget = TokenBudget()
         try:
-            api_key = os.getenv("GOOGLE_GEMINI_API_KEY")
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel("gemini-1.5-flash")
-            self.chat_session = None
+            self.model = model or create_model()
+            self.cache = get_cache("gemini", maxsize=256, ttl=GENERATION_TTL)
         except Exception as e:
             st.error(f"Error initializing Gemini: {e}")
             self.model = None
 
-    def initialize_chat(self, movie_context: str):
+    def has_chat(self, content_id: str) -> bool:
+        return str(content_id) in self.chats
+
+    def _seed_history(self, state: ChatState) -> List[Dict]:
+        if not state.context and not state.summary:
+            return []
+
+        prompt = CHAT_CONTEXT_PROMPT.format(context=state.context)
+        if state.summary:
+            prompt += f"\n\nSummary of the conversation so far: {state.summary}"
+        return [
+            {"role": "user", "parts": [prompt]},
+            {"role": "model", "parts": [CHAT_CONTEXT_REPLY]},
+        ]
+
+    def initialize_chat(self, content_id: str, movie_context: str) -> bool:
         if not self.model:
             return False
 
         try:
-            context_prompt = f"""You are a knowledgeable movie expert discussing "{movie_context}". 
-            Answer questions about this movie in a conversational, engaging way. 
-            Keep responses concise but informative. You can discuss plot, themes, characters, 
-            production details, and recommendations."""
-
-            self.chat_session = self.model.start_chat(history=[])
-
-            self.chat_session.send_message(context_prompt)
+            # The title context is seeded as the opening exchange of the chat
+            # history, so starting a chat costs no request of its own.
+            state = ChatState(movie_context)
+            state.session = self.model.start_chat(history=self._seed_history(state))
+            key = str(content_id)
+            self.chats[key] = state
+            self.chats.move_to_end(key)
+            while len(self.chats) > CHAT_POOL_SIZE:
+                self.chats.popitem(last=False)
             return True
         except Exception as e:
             st.error(f"Error initializing chat: {e}")
             return False
 
-    def chat_about_movie(self, message: str) -> str:
+    def reset_chat(self, content_id: str):
+        self.chats.pop(str(content_id), None)
+
+    def chat_turns(self, content_id: str) -> List[Dict]:
+        state = self.chats.get(str(content_id))
+        return state.turns if state else []
+
+    def _chat_state(self, content_id: str) -> ChatState:
+        key = str(content_id)
+        state = self.chats.get(key)
+        if state is None:
+            state = self.chats[key] = ChatState("")
+            state.session = self.model.start_chat(history=[])
+        self.chats.move_to_end(key)
+        return state
+
+    def _prepare_turn(self, content_id: str, message: str):
+        state = self._chat_state(content_id)
+        history = list(state.session.history)
+        compacted = False
+
+        if self.budget.over_budget(history, message):
+            older, recent = self.budget.split(
+                history, len(self._seed_history(state))
+            )
+            if older:
+                prompt = CHAT_SUMMARY_PROMPT.format(
+                    summary=state.summary or "None yet.",
+                    transcript=format_transcript(older),
+                )
+                state.summary = self.model.generate_content(prompt).text.strip()
+                state.session = self.model.start_chat(
+                    history=self._seed_history(state) + recent
+                )
+                history = list(state.session.history)
+                compacted = True
+
+        return state, self.budget.prompt_tokens(history, message), compacted
+
+    def _record_turn(
+        self, state: ChatState, estimated: int, response, compacted: bool
+    ):
+        usage = getattr(response, "usage_metadata", None)
+        actual = getattr(usage, "prompt_token_count", 0) if usage else 0
+        state.turns.append(turn_report(estimated, actual, compacted))
+
+    def stream_chat_about_movie(self, message: str, content_id: str) -> Iterator[str]:
         if not self.model:
-            return "AI service unavailable"
+            yield "AI service unavailable"
+            return
 
         try:
-            if not self.chat_session:
-                self.chat_session = self.model.start_chat(history=[])
-            
-            response = self.chat_session.send_message(message)
-            return response.text
+            with self.scheduler.slot("chat", self.session_id):
+                state, estimated, compacted = self._prepare_turn(content_id, message)
+                response = state.session.send_message(message, stream=True)
+                for chunk in response:
+                    yield chunk.text
+            self._record_turn(state, estimated, response, compacted)
+        except (SchedulerBusy, QuotaExceeded) as e:
+            yield f"⏳ {e}"
         except Exception as e:
-            return f"Error in chat: {str(e)}"
+            yield f"Error in chat: {str(e)}"
+
+    def _generate(self, template: str, regenerate: bool = False, **inputs) -> str:
+        key = prompt_key(template, inputs)
+        if not regenerate:
+            cached = self.cache.get(key)
+            if cached is not MISSING:
+                return cached
 
-    def generate_summary(self, plot: str) -> str:
+        _, prompt = PROMPTS[template]
+        with self.scheduler.slot(template, self.session_id):
+            text = self.model.generate_content(prompt.format(**inputs)).text
+        self.cache.set(key, text, PROMPT_TTLS[template])
+        return text
+
+    def generate_similar_recommendations(
+        self, title: str, genre: str, mood: str = "general", regenerate: bool = False
+    ) -> List[str]:
         if not self.model:
-            return "AI service unavailable"
+            return ["AI service unavailable"]
 
         try:
-            prompt = f"Summarize the following plot in exactly 2 sentences without spoilers. Convince me to watch this movie in the most human way possible.'{plot}'"
-            response = self.model.generate_content(prompt)
-            return response.text
+            text = self._generate(
+                "similar", regenerate, title=title, genre=genre, mood=mood
+            )
+            return [str(item) for item in text.split("\n")]
+        except (SchedulerBusy, QuotaExceeded) as e:
+            return [f"⏳ {e}"]
         except Exception as e:
-            return f"Error generating summary: {e}"
+            return [f"Error generating recommendations: {e}"]
 
-    def generate_why_watch(self, title: str, plot: str, genre: str) -> str:
+    def generate_insights(
+        self, item: Dict, regenerate: bool = False, priority: str = "summary"
+    ) -> Dict:
         if not self.model:
-            return "AI service unavailable"
+            return {"error": "AI service unavailable"}
+
+        inputs = describe_item(item)
+        key = prompt_key("insights", inputs)
+        if not regenerate:
+            cached = self.cache.get(key)
+            if cached is not MISSING:
+                return cached
 
         try:
-            prompt = f"Write one persuasive sentence to convince a 20-35 year old to watch '{title}' (Genre: {genre}). Plot: {plot}. Convince me to watch this movie in the most human way possible. "
-            response = self.model.generate_content(prompt)
-            return response.text
+            _, prompt = PROMPTS["insights"]
+            with self.scheduler.slot(priority, self.session_id):
+                response = self.model.generate_content(
+                    prompt.format(**inputs),
+                    generation_config={"response_mime_type": "application/json"},
+                )
+            insights = parse_insights(response.text)
+        except (SchedulerBusy, QuotaExceeded) as e:
+            return {"error": f"⏳ {e}"}
         except Exception as e:
-            return f"Error generating recommendation: {e}"
+            return {"error": f"Error generating insights: {e}"}
 
-    def generate_similar_recommendations(
-        self, title: str, genre: str, mood: str = "general"
-    ) -> List[str]:
-        if not self.model:
-            return ["AI service unavailable"]
+        self.cache.set(key, insights, PROMPT_TTLS["insights"])
+        return insights
+
+    def recommend_similar(
+        self, item: Dict, mood: str = "general", regenerate: bool = False
+    ) -> Dict:
+        if mood == "general":
+            insights = self.generate_insights(item, regenerate, priority="similar")
+            if "error" in insights:
+                return insights
+            return {"recommendations": insights["recommendations"]}
 
+        details = describe_item(item)
+        lines = self.generate_similar_recommendations(
+            details["title"], details["genre"], mood, regenerate
+        )
+        recommendations = parse_recommendation_lines(lines)
+        if not recommendations:
+            message = next((line for line in lines if line.strip()), "")
+            return {"error": message or "No recommendations found"}
+        return {"recommendations": recommendations}
+
+    def rerank_similar(self, item: Dict, candidates: List[Dict]) -> List[Dict]:
+        # Optional pass over the local recommender's picks; if Gemini is
+        # unavailable or busy the local order is kept as is.
+        if not self.model or len(candidates) < 2:
+            return candidates
+
+        details = describe_item(item)
+        lines = []
+        for number, candidate in enumerate(candidates, 1):
+            described = describe_item(candidate)
+            lines.append(f"{number}. {described['title']} ({described['genre']})")
         try:
-            prompt = f"Recommend 5 similar movies/shows to '{title}' (Genre: {genre}) for mood '{mood}'. Give each with one-line reason. Format as numbered list."
-            response = self.model.generate_content(prompt)
-            return [str(item) for item in response.text.split("\n")]
-        except Exception as e:
-            return [f"Error generating recommendations: {e}"]
\ No newline at end of file
+            text = self._generate(
+                "rerank",
+                title=details["title"],
+                genre=details["genre"],
+                candidates="\n".join(lines),
+            )
+        except Exception:
+            return candidates
+        return [candidates[i] for i in parse_ranking(text, len(candidates))]
@@ -1,27 +1,137 @@
+import time
 import requests
 import streamlit as st
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
+from app.utils.cache import get_cache, load_once, normalize_query
+from app.utils.http import PooledSession
+from app.utils.ratelimit import RateLimiter, TokenBucket, backoff_delay
+from app.utils.singleflight import SingleFlight
+
+SEARCH_TTL = 60 * 60
+DETAILS_TTL = 6 * 60 * 60
+NEGATIVE_TTL = 5 * 60
+MAX_RETRIES = 3
+JIKAN_URL = "https://api.jikan.moe/v4"
+
+# Jikan allows ~3 req/s and 60 req/min. The second bucket keeps any 60s
+# window at or below 60 requests (6 burst + 0.9/s * 60s).
+_limiter = RateLimiter(
+    [TokenBucket(rate=3, capacity=3), TokenBucket(rate=0.9, capacity=6)]
+)
+_flight = SingleFlight()
+
+
+def store_search(cache, key: Tuple[str, str], results: List[Dict]):
+    cache.set(key, results, SEARCH_TTL if results else NEGATIVE_TTL)
+    # Search hits are full anime resources, so they double as detail
+    # entries and "View Details" needs no extra request.
+    for anime in results:
+        if anime.get("mal_id") is not None:
+            cache.set(details_key(anime["mal_id"]), anime, DETAILS_TTL)
+
+
+def search_key(query: str) -> Tuple[str, str]:
+    return ("search", normalize_query(query))
+
+
+def search_params(query: str) -> Dict:
+    return {"q": query, "limit": 10}
+
+
+def details_key(anime_id) -> Tuple[str, str]:
+    return ("details", str(anime_id).strip())
 
 
 class JikanClient:
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, on_details: Optional[Callable[[Dict], None]] = None):
+        self.session = PooledSession()
+        # Search hits are full anime records too, so both paths report here.
+        self.on_details = on_details
+        self.cache = get_cache("jikan", maxsize=512, ttl=SEARCH_TTL)
+        self.limiter = _limiter
+        self.flight = _flight
+        self._aio = None
+
+    @property
+    def aio(self):
+        # Async twin used for fan-out; httpx and its event loop thread are
+        # only loaded once something fans out.
+        if self._aio is None:
+            from app.clients.aio import AsyncJikanClient
+
+            self._aio = AsyncJikanClient(self)
+        return self._aio
+
+    def _get(self, url: str, params: Optional[Dict] = None) -> requests.Response:
+        for attempt in range(MAX_RETRIES + 1):
+            self.limiter.acquire()
+            response = self.session.get(url, params=params, timeout=10)
+            if response.status_code != 429 or attempt == MAX_RETRIES:
+                return response
+
+            delay = backoff_delay(attempt, response.headers.get("Retry-After"))
+            self.limiter.penalize(delay)
+            time.sleep(delay)
+        return response
+
+    # Response handling is shared with AsyncJikanClient, which only swaps the
+    # HTTP stack; both response types offer .status_code, .raise_for_status()
+    # and .json().
+    def store_search_response(self, key: Tuple[str, str], response) -> List[Dict]:
+        response.raise_for_status()
+        results = response.json().get("data", [])
+        store_search(self.cache, key, results)
+        return results
+
+    def store_details(self, key: Tuple[str, str], response) -> Optional[Dict]:
+        if response.status_code == 404:
+            self.cache.set(key, None, NEGATIVE_TTL)
+            return None
+        response.raise_for_status()
+        data = response.json().get("data")
+        self.cache.set(key, data, DETAILS_TTL)
+        return data
+
+    def publish(self, records: List[Dict]):
+        if self.on_details:
+            for anime in records:
+                if anime:
+                    self.on_details(anime)
+
+    # search and details raise on failure; search_anime and get_anime_details
+    # report errors with st.error instead.
+    def search(self, query: str) -> List[Dict]:
+        key = search_key(query)
+
+        def fetch():
+            response = self._get(f"{JIKAN_URL}/anime", params=search_params(query))
+            return self.store_search_response(key, response)
+
+        results = load_once(self.cache, self.flight, key, fetch)
+        self.publish(results)
+        return results
+
+    def details(self, anime_id: str) -> Optional[Dict]:
+        key = details_key(anime_id)
+
+        def fetch():
+            response = self._get(f"{JIKAN_URL}/anime/{key[1]}")
+            return self.store_details(key, response)
+
+        data = load_once(self.cache, self.flight, key, fetch)
+        self.publish([data])
+        return data
 
     def search_anime(self, query: str) -> List[Dict]:
         try:
-            url = f"https://api.jikan.moe/v4/anime?q={query}&limit=10"
-            response = self.session.get(url, timeout=10)
-            data = response.json()
-            return data.get("data", [])
+            return self.search(query)
         except Exception as e:
             st.error(f"Error searching anime: {e}")
             return []
 
     def get_anime_details(self, anime_id: str) -> Optional[Dict]:
         try:
-            url = f"https://api.jikan.moe/v4/anime/{anime_id}"
-            response = self.session.get(url, timeout=10)
-            return response.json().get("data")
+            return self.details(anime_id)
         except Exception as e:
             st.error(f"Error getting anime details: {e}")
             return None
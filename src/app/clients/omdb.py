@@ -1,34 +1,195 @@
+import math
 import os
-import requests
 import streamlit as st
-from typing import Dict, List, Optional
+from concurrent.futures import as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from app.utils.cache import get_cache, load_once, normalize_query
+from app.utils.http import PooledSession
+from app.utils.prefetch import PrefetchBatch
+from app.utils.singleflight import SingleFlight
+
+SEARCH_TTL = 60 * 60
+DETAILS_TTL = 6 * 60 * 60
+NEGATIVE_TTL = 5 * 60
+OMDB_URL = "https://www.omdbapi.com/"
+PREFETCH_LIMIT = 5
+PAGE_SIZE = 10
+MAX_PAGES = 5
+# OMDb answers every failure with Response "False"; only these say something
+# about the query itself. Quota and key errors must not be cached, or one
+# blip would hide results from every session until the entry expires.
+NOT_FOUND_ERRORS = {"Movie not found!", "Incorrect IMDb ID.", "Too many results."}
+
+_flight = SingleFlight()
+
+
+class OMDBError(Exception):
+    pass
+
+
+def check_response(data: Dict) -> bool:
+    if data.get("Response") == "True":
+        return True
+    error = data.get("Error", "Unknown OMDb error")
+    if error not in NOT_FOUND_ERRORS:
+        raise OMDBError(error)
+    return False
+
+
+def parse_search_page(data: Dict) -> Tuple[Dict, int]:
+    if check_response(data):
+        result = {
+            "results": data.get("Search", []),
+            "total": int(data.get("totalResults", 0)),
+        }
+        return result, SEARCH_TTL
+    return {"results": [], "total": 0}, NEGATIVE_TTL
+
+
+def details_ttl(data: Dict) -> int:
+    return DETAILS_TTL if check_response(data) else NEGATIVE_TTL
+
+
+def page_key(query: str, page: int) -> Tuple:
+    return ("search", normalize_query(query), page)
+
+
+def details_key(imdb_id: str) -> Tuple:
+    return ("details", imdb_id.strip())
 
 
 class OMDBClient:
-    def __init__(self):
+    def __init__(self, on_details: Optional[Callable[[Dict], None]] = None):
         self.omdb_key = os.getenv("OMDB_API_KEY")
-        self.session = requests.Session()
+        # Called with every detail record served, cached or not, so local
+        # indexes (e.g. the content recommender) see everything users browse.
+        self.on_details = on_details
+        self.session = PooledSession()
+        self.cache = get_cache("omdb", maxsize=512, ttl=SEARCH_TTL)
+        self.flight = _flight
+        self._aio = None
+
+    @property
+    def aio(self):
+        # Async twin used for fan-out; httpx and its event loop thread are
+        # only loaded once something fans out.
+        if self._aio is None:
+            from app.clients.aio import AsyncOMDBClient
+
+            self._aio = AsyncOMDBClient(self)
+        return self._aio
+
+    # Request params and response handling are shared with AsyncOMDBClient,
+    # which only swaps the HTTP stack; both response types offer .json().
+    def page_params(self, query: str, page: int) -> Dict:
+        return {"s": query, "type": "movie", "page": page, "apikey": self.omdb_key}
+
+    def details_params(self, imdb_id: str) -> Dict:
+        return {"i": imdb_id, "plot": "full", "apikey": self.omdb_key}
+
+    def store_page(self, key: Tuple, response) -> Dict:
+        result, ttl = parse_search_page(response.json())
+        self.cache.set(key, result, ttl)
+        return result
+
+    def store_details(self, key: Tuple, response) -> Dict:
+        data = response.json()
+        self.cache.set(key, data, details_ttl(data))
+        return data
+
+    def publish(self, data: Dict):
+        if self.on_details and data.get("Response") == "True":
+            self.on_details(data)
+
+    def search_page(self, query: str, page: int = 1) -> Dict:
+        key = page_key(query, page)
+
+        def fetch():
+            response = self.session.get(
+                OMDB_URL, params=self.page_params(query, page), timeout=10
+            )
+            return self.store_page(key, response)
+
+        return load_once(self.cache, self.flight, key, fetch)
+
+    def details(self, imdb_id: str) -> Dict:
+        key = details_key(imdb_id)
+
+        def fetch():
+            response = self.session.get(
+                OMDB_URL, params=self.details_params(imdb_id), timeout=10
+            )
+            return self.store_details(key, response)
+
+        data = load_once(self.cache, self.flight, key, fetch)
+        self.publish(data)
+        return data
+
+    # search_page, search and details raise on failure; search_movies* and
+    # get_movie_details report errors with st.error instead.
+    def search(self, query: str) -> List[Dict]:
+        return self.search_page(query)["results"]
 
     def search_movies(self, query: str) -> List[Dict]:
         try:
-            url = f"http://www.omdbapi.com/?s={query}&type=movie&apikey={self.omdb_key}"
-            response = self.session.get(url, timeout=10)
-            data = response.json()
-
-            if data.get("Response") == "True":
-                return data.get("Search", [])
-            return []
+            return self.search(query)
         except Exception as e:
             st.error(f"Error searching movies: {e}")
             return []
 
+    def search_movies_paged(
+        self, query: str, max_results: int = PAGE_SIZE * MAX_PAGES
+    ) -> Iterator[List[Dict]]:
+        try:
+            first = self.search_page(query)
+        except Exception as e:
+            st.error(f"Error searching movies: {e}")
+            return
+
+        remaining = max_results
+        chunk = first["results"][:remaining]
+        remaining -= len(chunk)
+        yield chunk
+
+        pages = min(
+            math.ceil(first["total"] / PAGE_SIZE),
+            math.ceil(max_results / PAGE_SIZE),
+            MAX_PAGES,
+        )
+        if remaining <= 0 or pages < 2:
+            return
+
+        from app.clients.aio import submit
+
+        # The remaining pages are fetched concurrently on the async client.
+        futures = [
+            submit(self.aio.search_page(query, page)) for page in range(2, pages + 1)
+        ]
+        try:
+            for future in as_completed(futures):
+                try:
+                    chunk = future.result()["results"][:remaining]
+                except Exception:
+                    continue
+                remaining -= len(chunk)
+                yield chunk
+                if remaining <= 0:
+                    break
+        finally:
+            for future in futures:
+                future.cancel()
+
     def get_movie_details(self, imdb_id: str) -> Optional[Dict]:
         try:
-            url = (
-                f"http://www.omdbapi.com/?i={imdb_id}&plot=full&apikey={self.omdb_key}"
-            )
-            response = self.session.get(url, timeout=10)
-            return response.json()
+            return self.details(imdb_id)
         except Exception as e:
             st.error(f"Error getting movie details: {e}")
             return None
+
+    def prefetch_details(
+        self, results: List[Dict], limit: int = PREFETCH_LIMIT
+    ) -> PrefetchBatch:
+        from app.clients.aio import submit
+
+        imdb_ids = [r["imdbID"] for r in results[:limit] if r.get("imdbID")]
+        return PrefetchBatch([submit(self.aio.details(i)) for i in imdb_ids])
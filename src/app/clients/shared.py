@@ -0,0 +1,51 @@
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from app.clients.googlegemini import GeminiAI, create_model
+from app.clients.jikan import JikanClient
+from app.clients.omdb import OMDBClient
+
+
+def index_movie(movie):
+    # Imported on first use so NumPy stays off the cold-start path.
+    from app.utils.recommender import get_index
+
+    get_index().add_movie(movie)
+
+
+def index_anime(anime):
+    from app.utils.recommender import get_index
+
+    get_index().add_anime(anime)
+
+
+@st.cache_resource
+def get_omdb_client() -> OMDBClient:
+    return OMDBClient(on_details=index_movie)
+
+
+@st.cache_resource
+def get_jikan_client() -> JikanClient:
+    return JikanClient(on_details=index_anime)
+
+
+@st.cache_resource
+def get_gemini_model():
+    return create_model()
+
+
+def get_gemini_ai() -> GeminiAI:
+    # The model is process-wide, but GeminiAI holds chat state, so each
+    # browser session keeps its own wrapper around the shared model.
+    if "gemini_ai" not in st.session_state:
+        ctx = get_script_run_ctx()
+        try:
+            model = get_gemini_model()
+        except Exception:
+            # A missing or broken SDK must not take the detail view down:
+            # GeminiAI retries the model itself, reports the error with
+            # st.error and disables only the AI features.
+            model = None
+        st.session_state.gemini_ai = GeminiAI(
+            model=model, session_id=ctx.session_id if ctx else "anonymous"
+        )
+    return st.session_state.gemini_ai
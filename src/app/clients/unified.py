@@ -0,0 +1,123 @@
+from difflib import SequenceMatcher
+from typing import Dict, List, Tuple
+from app.clients.aio import submit
+from app.utils.cache import normalize_query
+from app.utils.recommender import TOP_K, get_index
+
+
+def normalize_movie(movie: Dict) -> Dict:
+    poster = movie.get("Poster")
+    return {
+        "kind": "movie",
+        "id": movie.get("imdbID"),
+        "title": movie.get("Title", "Unknown"),
+        "year": movie.get("Year", "Unknown"),
+        "image": poster if poster and poster != "N/A" else "",
+        "score": None,
+        "raw": movie,
+    }
+
+
+def normalize_anime(anime: Dict) -> Dict:
+    aired = (anime.get("aired") or {}).get("prop", {}).get("from", {})
+    return {
+        "kind": "anime",
+        "id": anime.get("mal_id"),
+        "title": anime.get("title", "Unknown"),
+        "year": anime.get("year") or aired.get("year") or "Unknown",
+        "image": anime.get("images", {}).get("jpg", {}).get("image_url", ""),
+        "score": anime.get("score"),
+        "raw": anime,
+    }
+
+
+def title_similarity(query: str, title: str) -> float:
+    query = normalize_query(query)
+    title = normalize_query(title or "")
+    if not query or not title:
+        return 0.0
+    if title == query:
+        return 1.0
+
+    score = SequenceMatcher(None, query, title).ratio()
+    if title.startswith(query):
+        score = max(score, 0.9)
+    elif query in title:
+        score = max(score, 0.75)
+    return score
+
+
+def rank_results(query: str, results: List[Dict]) -> List[Dict]:
+    # Upstream order breaks ties so each API's own relevance is kept.
+    return sorted(
+        results,
+        key=lambda item: (-title_similarity(query, item["title"]), item["rank"]),
+    )
+
+
+class UnifiedSearch:
+    def __init__(self, omdb_client, jikan_client):
+        self.omdb_client = omdb_client
+        self.jikan_client = jikan_client
+
+    def search_all(self, query: str) -> Tuple[List[Dict], List[str]]:
+        movies = submit(self.omdb_client.aio.search(query))
+        anime = submit(self.jikan_client.aio.search(query))
+
+        merged, errors = [], []
+        for future, normalize, label in (
+            (movies, normalize_movie, "movies"),
+            (anime, normalize_anime, "anime"),
+        ):
+            try:
+                items = future.result()
+            except Exception as e:
+                errors.append(f"Error searching {label}: {e}")
+                continue
+            for rank, item in enumerate(items):
+                result = normalize(item)
+                result["rank"] = rank
+                merged.append(result)
+
+        return rank_results(query, merged), errors
+
+
+MIN_MATCH_SIMILARITY = 0.6
+
+
+def resolve_titles(recommendations: List[Dict], kind: str, api_client) -> List[Dict]:
+    # Looks every AI-suggested title up at once; each lookup goes through the
+    # clients' cache, singleflight and rate limiting, and a failed or weak
+    # match just leaves the suggestion unresolved instead of failing the set.
+    normalize = normalize_anime if kind == "anime" else normalize_movie
+    futures = [submit(api_client.aio.search(rec["title"])) for rec in recommendations]
+
+    resolved, seen = [], set()
+    for rec, future in zip(recommendations, futures):
+        match = None
+        try:
+            candidates = [normalize(item) for item in future.result()]
+        except Exception:
+            candidates = []
+        if candidates:
+            best = max(
+                candidates, key=lambda c: title_similarity(rec["title"], c["title"])
+            )
+            if title_similarity(rec["title"], best["title"]) >= MIN_MATCH_SIMILARITY:
+                match = best
+        if match:
+            # Repeated titles, or one with and without its year, can land on
+            # the same record; its card (and widget key) must appear once.
+            if (match["kind"], match["id"]) in seen:
+                continue
+            seen.add((match["kind"], match["id"]))
+        resolved.append(
+            {"title": rec["title"], "reason": rec["reason"], "match": match}
+        )
+    return resolved
+
+
+def local_similar(kind: str, item_id, k: int = TOP_K) -> List[Dict]:
+    # Served from the in-process content index, so no network or model call.
+    normalize = normalize_anime if kind == "anime" else normalize_movie
+    return [normalize(record) for _, _, record in get_index().similar(kind, item_id, k)]
@@ -0,0 +1,66 @@
+import streamlit as st
+from app.utils.reruns import mark_action
+
+# on_click callbacks for the detail views. Streamlit runs them before the
+# script run the click triggers, so that run already sees the new state and
+# no st.rerun() is needed.
+
+
+def show_ai_features():
+    mark_action("ai_features")
+    st.session_state.show_ai_features = True
+
+
+def queue_chat_message(content_id, input_key: str):
+    mark_action("chat_send")
+    question = st.session_state.get(input_key, "").strip()
+    if not question:
+        return
+    st.session_state[f"chat_history_{content_id}"].append(
+        {"role": "user", "message": question}
+    )
+    # The reply is streamed by the panel during this run.
+    st.session_state[f"chat_pending_{content_id}"] = question
+    st.session_state[input_key] = ""
+
+
+def clear_chat(ai_client, content_id):
+    mark_action("chat_clear")
+    st.session_state[f"chat_history_{content_id}"] = []
+    st.session_state.pop(f"chat_pending_{content_id}", None)
+    ai_client.reset_chat(content_id)
+
+
+def start_chat(ai_client, content_id, context: str) -> bool:
+    if not ai_client.initialize_chat(content_id, context):
+        return False
+    # A new session (first open, or the pool evicted the old one) knows
+    # nothing of earlier turns, so the transcript on screen starts over with
+    # it. A message queued for this run is kept.
+    history_key = f"chat_history_{content_id}"
+    if st.session_state.get(history_key):
+        st.caption("💤 The earlier conversation expired; starting a new chat.")
+    pending = st.session_state.get(f"chat_pending_{content_id}")
+    st.session_state[history_key] = (
+        [{"role": "user", "message": pending}] if pending is not None else []
+    )
+    return True
+
+
+def stream_pending_reply(ai_client, content_id):
+    question = st.session_state.pop(f"chat_pending_{content_id}", None)
+    if question is None:
+        return
+    placeholder = st.empty()
+    with placeholder:
+        ai_response = st.write_stream(
+            ai_client.stream_chat_about_movie(question, content_id)
+        )
+    # Swap the plain streamed text for the same bubble the history uses.
+    placeholder.markdown(
+        f'<div class="chat-message ai-message"><strong>AI:</strong> {ai_response}</div>',
+        unsafe_allow_html=True,
+    )
+    st.session_state[f"chat_history_{content_id}"].append(
+        {"role": "ai", "message": ai_response}
+    )
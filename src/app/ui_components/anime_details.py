@@ -1,4 +1,14 @@
 import streamlit as st
+from typing import Dict
+from app.clients.unified import local_similar, normalize_anime, resolve_titles
+from app.ui_components.actions import (
+    clear_chat,
+    queue_chat_message,
+    show_ai_features,
+    start_chat,
+    stream_pending_reply,
+)
+from app.ui_components.cards import display_result_grid, display_similar_results
 from app.utils.watchlist import add_to_watchlist, save_anime_info
 
 
@@ -64,13 +74,12 @@ def display_anime_details(anime_id: str, api_client, ai_client):
             save_anime_info(anime)
 
     with col3:
-        if st.button(
+        st.button(
             "🤖 AI Features",
             key=f"anime_ai_features_{anime_id}",
             help="Explore AI-powered insights",
-        ):
-            st.session_state.show_ai_features = True
-            st.rerun()
+            on_click=show_ai_features,
+        )
 
     if st.session_state.get("show_ai_features", False):
         st.markdown('<div class="ai-section">', unsafe_allow_html=True)
@@ -81,127 +90,195 @@ def display_anime_details(anime_id: str, api_client, ai_client):
         )
 
         with tab1:
-            if st.button("🔍 Generate AI Summary", key=f"anime_summary_btn_{anime_id}"):
-                if anime.get("synopsis"):
-                    with st.spinner("Generating summary..."):
-                        summary = ai_client.generate_summary(anime["synopsis"])
-                        st.markdown(f"**AI Summary:**")
-                        st.write(summary)
-                        st.markdown(
-                            '<p class="ai-disclaimer">🤖 AI-generated • May be imperfect</p>',
-                            unsafe_allow_html=True,
-                        )
+            display_summary_tab(anime_id, anime, api_client, ai_client)
 
         with tab2:
-            if st.button(
-                "💡 Generate Recommendation", key=f"anime_why_watch_btn_{anime_id}"
-            ):
-                if anime.get("synopsis"):
-                    with st.spinner("Generating recommendation..."):
-                        genre_names = ", ".join(
-                            [genre["name"] for genre in anime.get("genres", [])]
-                        )
-                        why_watch = ai_client.generate_why_watch(
-                            anime.get("title", ""),
-                            anime.get("synopsis", ""),
-                            genre_names,
-                        )
-                        st.markdown(f"**Why You Should Watch:**")
-                        st.write(why_watch)
-                        st.markdown(
-                            '<p class="ai-disclaimer">🤖 AI-generated • May be imperfect</p>',
-                            unsafe_allow_html=True,
-                        )
+            display_why_watch_tab(anime_id, anime, api_client, ai_client)
 
         with tab3:
-            mood = st.selectbox(
-                "Select Mood:",
-                [
-                    "general",
-                    "action",
-                    "romance",
-                    "comedy",
-                    "drama",
-                    "thriller",
-                    "slice of life",
-                    "fantasy",
-                ],
-                key=f"anime_mood_select_{anime_id}",
+            display_similar_tab(anime_id, anime, api_client, ai_client)
+
+        with tab4:
+            display_chat_panel(anime_id, anime, api_client, ai_client)
+
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    st.markdown("</div>", unsafe_allow_html=True)
+
+
+@st.fragment
+def display_summary_tab(anime_id: str, anime: Dict, api_client, ai_client):
+    generate = st.button("🔍 Generate AI Summary", key=f"anime_summary_btn_{anime_id}")
+    regenerate = st.button(
+        "🔄 Regenerate",
+        key=f"anime_summary_regen_btn_{anime_id}",
+        help="Ask Gemini again",
+    )
+    if generate or regenerate:
+        if anime.get("synopsis"):
+            with st.spinner("Generating summary..."):
+                insights = ai_client.generate_insights(anime, regenerate=regenerate)
+            if "error" in insights:
+                st.error(insights["error"])
+            else:
+                st.markdown(f"**AI Summary:**")
+                st.write(insights["summary"])
+            st.markdown(
+                '<p class="ai-disclaimer">🤖 AI-generated • May be imperfect</p>',
+                unsafe_allow_html=True,
             )
-            if st.button("🎯 Find Similar Anime", key=f"anime_similar_btn_{anime_id}"):
-                with st.spinner("Finding similar anime..."):
-                    genre_names = ", ".join(
-                        [genre["name"] for genre in anime.get("genres", [])]
-                    )
-                    recommendations = ai_client.generate_similar_recommendations(
-                        anime.get("title", ""), genre_names, mood
+
+
+@st.fragment
+def display_why_watch_tab(anime_id: str, anime: Dict, api_client, ai_client):
+    generate = st.button(
+        "💡 Generate Recommendation", key=f"anime_why_watch_btn_{anime_id}"
+    )
+    regenerate = st.button(
+        "🔄 Regenerate",
+        key=f"anime_why_watch_regen_btn_{anime_id}",
+        help="Ask Gemini again",
+    )
+    if generate or regenerate:
+        if anime.get("synopsis"):
+            with st.spinner("Generating recommendation..."):
+                insights = ai_client.generate_insights(
+                    anime, regenerate=regenerate, priority="why_watch"
+                )
+            if "error" in insights:
+                st.error(insights["error"])
+            else:
+                st.markdown(f"**Why You Should Watch:**")
+                st.write(insights["why_watch"])
+            st.markdown(
+                '<p class="ai-disclaimer">🤖 AI-generated • May be imperfect</p>',
+                unsafe_allow_html=True,
+            )
+
+
+def display_similar_tab(anime_id: str, anime: Dict, api_client, ai_client):
+    # Not a fragment: its cards select another title, which needs the whole
+    # page, so a fragment run would always be followed by a second full run.
+    picks = local_similar("anime", anime_id)
+    if picks:
+        st.markdown("**⚡ Instant picks from titles browsed here:**")
+        if st.checkbox(
+            "Re-rank with AI",
+            key=f"anime_local_rerank_{anime_id}",
+            help="Let Gemini reorder these picks",
+        ):
+            with st.spinner("Re-ranking..."):
+                ranked = ai_client.rerank_similar(
+                    anime, [pick["raw"] for pick in picks]
+                )
+            picks = [normalize_anime(record) for record in ranked]
+        display_result_grid(picks, f"anime_local_similar_{anime_id}_")
+        st.markdown("---")
+
+    mood = st.selectbox(
+        "Select Mood:",
+        [
+            "general",
+            "action",
+            "romance",
+            "comedy",
+            "drama",
+            "thriller",
+            "slice of life",
+            "fantasy",
+        ],
+        key=f"anime_mood_select_{anime_id}",
+    )
+    generate = st.button("🎯 Find Similar Anime", key=f"anime_similar_btn_{anime_id}")
+    regenerate = st.button(
+        "🔄 Regenerate",
+        key=f"anime_similar_regen_btn_{anime_id}",
+        help="Ask Gemini again",
+    )
+    similar_key = f"anime_similar_{anime_id}"
+    if generate or regenerate:
+        with st.spinner("Finding similar anime..."):
+            recommendations = ai_client.recommend_similar(
+                anime, mood, regenerate=regenerate
+            )
+            if "error" in recommendations:
+                st.error(recommendations["error"])
+                st.session_state.pop(similar_key, None)
+            else:
+                st.session_state[similar_key] = {
+                    "mood": mood,
+                    "results": resolve_titles(
+                        recommendations["recommendations"], "anime", api_client
+                    ),
+                }
+
+    # Kept in session state so the cards' buttons survive the rerun
+    # they trigger.
+    similar = st.session_state.get(similar_key)
+    if similar:
+        st.markdown(f"**Similar Anime for {similar['mood']} mood:**")
+        display_similar_results(similar["results"], f"anime_similar_{anime_id}_")
+        st.markdown(
+            '<p class="ai-disclaimer">🤖 AI-generated • May be imperfect</p>',
+            unsafe_allow_html=True,
+        )
+
+
+@st.fragment
+def display_chat_panel(anime_id: str, anime: Dict, api_client, ai_client):
+    st.markdown("### 💬 Chat about this Anime")
+
+    if not ai_client.has_chat(anime_id):
+        anime_context = f"{anime.get('title', 'Unknown')}: {anime.get('synopsis', 'No synopsis available')}"
+        if not start_chat(ai_client, anime_id, anime_context):
+            st.error("Failed to initialize chat")
+
+    if ai_client.has_chat(anime_id):
+        if f"chat_history_{anime_id}" in st.session_state:
+            for chat in st.session_state[f"chat_history_{anime_id}"]:
+                if chat["role"] == "user":
+                    st.markdown(
+                        f'<div class="chat-message user-message"><strong>You:</strong> {chat["message"]}</div>',
+                        unsafe_allow_html=True,
                     )
-                    st.markdown(f"**Similar Anime for {mood} mood:**")
-                    for rec in recommendations:
-                        if rec.strip():
-                            st.write(rec)
+                else:
                     st.markdown(
-                        '<p class="ai-disclaimer">🤖 AI-generated • May be imperfect</p>',
+                        f'<div class="chat-message ai-message"><strong>AI:</strong> {chat["message"]}</div>',
                         unsafe_allow_html=True,
                     )
 
-        with tab4:
-            st.markdown("### 💬 Chat about this Anime")
+        stream_pending_reply(ai_client, anime_id)
 
-            if f"chat_initialized_{anime_id}" not in st.session_state:
-                anime_context = f"{anime.get('title', 'Unknown')}: {anime.get('synopsis', 'No synopsis available')}"
-                if ai_client.initialize_chat(anime_context):
-                    st.session_state[f"chat_initialized_{anime_id}"] = True
-                    st.session_state[f"chat_history_{anime_id}"] = []
-                else:
-                    st.error("Failed to initialize chat")
-
-            if f"chat_initialized_{anime_id}" in st.session_state:
-                if f"chat_history_{anime_id}" in st.session_state:
-                    for chat in st.session_state[f"chat_history_{anime_id}"]:
-                        if chat["role"] == "user":
-                            st.markdown(
-                                f'<div class="chat-message user-message"><strong>You:</strong> {chat["message"]}</div>',
-                                unsafe_allow_html=True,
-                            )
-                        else:
-                            st.markdown(
-                                f'<div class="chat-message ai-message"><strong>AI:</strong> {chat["message"]}</div>',
-                                unsafe_allow_html=True,
-                            )
-
-                user_question = st.text_input(
-                    "Ask anything about this anime:",
-                    placeholder="e.g., What's the main theme? Who are the main characters?",
-                    key=f"anime_chat_input_{anime_id}",
-                )
+        st.text_input(
+            "Ask anything about this anime:",
+            placeholder="e.g., What's the main theme? Who are the main characters?",
+            key=f"anime_chat_input_{anime_id}",
+        )
 
-                col1, col2 = st.columns([1, 4])
-                with col1:
-                    if st.button("💬 Send", key=f"anime_chat_send_{anime_id}"):
-                        if user_question.strip():
-                            st.session_state[f"chat_history_{anime_id}"].append(
-                                {"role": "user", "message": user_question}
-                            )
-
-                            with st.spinner("AI is thinking..."):
-                                ai_response = ai_client.chat_about_movie(user_question)
-                                st.session_state[f"chat_history_{anime_id}"].append(
-                                    {"role": "ai", "message": ai_response}
-                                )
-
-                            st.rerun()
-
-                with col2:
-                    if st.button("🗑️ Clear Chat", key=f"anime_chat_clear_{anime_id}"):
-                        st.session_state[f"chat_history_{anime_id}"] = []
-                        st.rerun()
-
-                st.markdown(
-                    '<p class="ai-disclaimer">💬 Chat powered by Google Gemini • Responses may be imperfect</p>',
-                    unsafe_allow_html=True,
-                )
+        col1, col2 = st.columns([1, 4])
+        with col1:
+            st.button(
+                "💬 Send",
+                key=f"anime_chat_send_{anime_id}",
+                on_click=queue_chat_message,
+                args=(anime_id, f"anime_chat_input_{anime_id}"),
+            )
 
-        st.markdown("</div>", unsafe_allow_html=True)
+        with col2:
+            st.button(
+                "🗑️ Clear Chat",
+                key=f"anime_chat_clear_{anime_id}",
+                on_click=clear_chat,
+                args=(ai_client, anime_id),
+            )
 
-    st.markdown("</div>", unsafe_allow_html=True)
+        turns = ai_client.chat_turns(anime_id)
+        if turns:
+            last_turn = turns[-1]
+            note = " • earlier turns summarized" if last_turn["compacted"] else ""
+            st.caption(f"🧮 Last prompt: {last_turn['prompt_tokens']} tokens{note}")
+
+        st.markdown(
+            '<p class="ai-disclaimer">💬 Chat powered by Google Gemini • Responses may be imperfect</p>',
+            unsafe_allow_html=True,
+        )
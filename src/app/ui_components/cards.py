@@ -1,73 +1,140 @@
+import functools
+import html
 import streamlit as st
-from typing import Dict
-
-
-def display_movie_card(movie: Dict):
-    with st.container():
-        st.markdown('<div class="movie-card">', unsafe_allow_html=True)
-
-        col1, col2 = st.columns([1, 3])
-
-        with col1:
-            if movie.get("Poster") and movie["Poster"] != "N/A":
-                st.image(movie["Poster"], width=180)
-            else:
-                st.markdown(
-                    '<div style="width: 180px; height: 250px; background: linear-gradient(135deg, #374151 0%, #1f2937 100%); border-radius: 10px; display: flex; align-items: center; justify-content: center; color: #9ca3af;">🎬 No Poster</div>',
-                    unsafe_allow_html=True,
-                )
-
-        with col2:
-            st.markdown(f"### {movie.get('Title', 'Unknown')}")
-            st.markdown(f"**Year:** {movie.get('Year', 'Unknown')}")
-            st.markdown(f"**Type:** {movie.get('Type', 'Unknown').title()}")
-
-            if st.button(
-                f"🎬 View Details",
-                key=f"movie_{movie.get('imdbID')}",
-                help="Click to see full movie details below",
-            ):
-                st.session_state.selected_movie = movie.get("imdbID")
-                st.session_state.content_type = "movie"
-                st.info(
-                    "🔍 **Movie details are displayed below. Scroll down to view the complete information.**"
-                )
-                st.rerun()
-
-        st.markdown("</div>", unsafe_allow_html=True)
-
-
-def display_anime_card(anime: Dict):
-    with st.container():
-        st.markdown('<div class="movie-card">', unsafe_allow_html=True)
-
-        col1, col2 = st.columns([1, 3])
-
-        with col1:
-            if anime.get("images", {}).get("jpg", {}).get("image_url"):
-                st.image(anime["images"]["jpg"]["image_url"], width=180)
-            else:
-                st.markdown(
-                    '<div style="width: 180px; height: 250px; background: linear-gradient(135deg, #374151 0%, #1f2937 100%); border-radius: 10px; display: flex; align-items: center; justify-content: center; color: #9ca3af;">🎌 No Image</div>',
-                    unsafe_allow_html=True,
-                )
-
-        with col2:
-            st.markdown(f"### {anime.get('title', 'Unknown')}")
-            st.markdown(f"**Episodes:** {anime.get('episodes', 'Unknown')}")
-            st.markdown(f"**Score:** {anime.get('score', 'N/A')}/10")
-            st.markdown(f"**Status:** {anime.get('status', 'Unknown')}")
-
-            if st.button(
-                f"🎌 View Details",
-                key=f"anime_{anime.get('mal_id')}",
-                help="Click to see full anime details below",
-            ):
-                st.session_state.selected_anime = anime.get("mal_id")
-                st.session_state.content_type = "anime"
-                st.info(
-                    "🔍 **Anime details are displayed below. Scroll down to view the complete information.**"
-                )
-                st.rerun()
-
-        st.markdown("</div>", unsafe_allow_html=True)
+from string import Template
+from typing import Dict, List, Optional, Sequence, Tuple
+from app.utils.reruns import mark_action
+
+GRID_COLUMNS = 3
+
+TEMPLATES = {
+    "row": '<div class="card-grid">$cards</div>',
+    "card": (
+        '<div class="movie-card result-card">$poster'
+        '<div class="result-info"><h3>$title</h3>$meta$note</div></div>'
+    ),
+    "poster": '<img class="result-poster" src="$src" alt="$title" loading="lazy">',
+    "no_poster": '<div class="result-poster result-poster-empty">$label</div>',
+    "meta": "<p><strong>$label:</strong> $value</p>",
+    "note": '<p class="result-note">$note</p>',
+}
+
+# (kind, record, optional note shown under the card's details)
+CardEntry = Tuple[str, Dict, Optional[str]]
+
+
+@functools.lru_cache(maxsize=None)
+def template(name: str) -> Template:
+    return Template(TEMPLATES[name])
+
+
+def select_title(kind: str, item_id):
+    # on_click callback: the state is in place before the run the click
+    # triggers, so the details render in that same run.
+    mark_action(f"view_{kind}")
+    st.session_state[f"selected_{kind}"] = item_id
+    st.session_state.content_type = kind
+
+
+def card_fields(kind: str, record: Dict) -> Dict:
+    if kind == "movie":
+        poster = record.get("Poster")
+        return {
+            "id": record.get("imdbID"),
+            "title": record.get("Title", "Unknown"),
+            "image": poster if poster and poster != "N/A" else "",
+            "placeholder": "🎬 No Poster",
+            "button": "🎬 View Details",
+            "help": "Click to see full movie details below",
+            "meta": [
+                ("Year", record.get("Year", "Unknown")),
+                ("Type", str(record.get("Type", "Unknown")).title()),
+            ],
+        }
+    return {
+        "id": record.get("mal_id"),
+        "title": record.get("title", "Unknown"),
+        "image": record.get("images", {}).get("jpg", {}).get("image_url", ""),
+        "placeholder": "🎌 No Image",
+        "button": "🎌 View Details",
+        "help": "Click to see full anime details below",
+        "meta": [
+            ("Episodes", record.get("episodes", "Unknown")),
+            ("Score", f"{record.get('score', 'N/A')}/10"),
+            ("Status", record.get("status", "Unknown")),
+        ],
+    }
+
+
+def render_card(fields: Dict, note: Optional[str] = None) -> str:
+    title = html.escape(str(fields["title"]))
+    if fields["image"]:
+        poster = template("poster").substitute(
+            src=html.escape(fields["image"]), title=title
+        )
+    else:
+        poster = template("no_poster").substitute(label=fields["placeholder"])
+    meta = "".join(
+        template("meta").substitute(label=label, value=html.escape(str(value)))
+        for label, value in fields["meta"]
+    )
+    return template("card").substitute(
+        poster=poster,
+        title=title,
+        meta=meta,
+        note=template("note").substitute(note=html.escape(note)) if note else "",
+    )
+
+
+def display_card_grid(entries: Sequence[CardEntry], key_prefix: str = ""):
+    # Each row of cards is a single HTML element; only the View Details
+    # buttons are widgets, laid out in columns that line up with the grid.
+    for start in range(0, len(entries), GRID_COLUMNS):
+        row = [
+            (kind, card_fields(kind, record), note)
+            for kind, record, note in entries[start : start + GRID_COLUMNS]
+        ]
+        st.markdown(
+            template("row").substitute(
+                cards="".join(render_card(fields, note) for _, fields, note in row)
+            ),
+            unsafe_allow_html=True,
+        )
+        for column, (kind, fields, _) in zip(st.columns(GRID_COLUMNS), row):
+            column.button(
+                fields["button"],
+                key=f"{key_prefix}{kind}_{fields['id']}",
+                help=fields["help"],
+                on_click=select_title,
+                args=(kind, fields["id"]),
+            )
+
+
+def display_movie_grid(movies: List[Dict], key_prefix: str = ""):
+    display_card_grid([("movie", movie, None) for movie in movies], key_prefix)
+
+
+def display_anime_grid(anime: List[Dict], key_prefix: str = ""):
+    display_card_grid([("anime", item, None) for item in anime], key_prefix)
+
+
+def display_result_grid(results: List[Dict], key_prefix: str = ""):
+    display_card_grid(
+        [(result["kind"], result["raw"], None) for result in results], key_prefix
+    )
+
+
+def display_similar_results(resolved: List[Dict], key_prefix: str):
+    display_card_grid(
+        [
+            (rec["match"]["kind"], rec["match"]["raw"], rec["reason"] or None)
+            for rec in resolved
+            if rec["match"]
+        ],
+        key_prefix,
+    )
+    # Not found in the catalog; still worth showing as suggestions.
+    for rec in resolved:
+        if not rec["match"]:
+            line = f"**{rec['title']}**"
+            st.markdown(f"{line} - {rec['reason']}" if rec["reason"] else line)
@@ -1,4 +1,14 @@
 import streamlit as st
+from typing import Dict
+from app.clients.unified import local_similar, normalize_movie, resolve_titles
+from app.ui_components.actions import (
+    clear_chat,
+    queue_chat_message,
+    show_ai_features,
+    start_chat,
+    stream_pending_reply,
+)
+from app.ui_components.cards import display_result_grid, display_similar_results
 from app.utils.watchlist import add_to_watchlist, save_movie_info
 
 
@@ -59,9 +69,11 @@ def display_movie_details(movie_id: str, api_client, ai_client):
             save_movie_info(movie)
 
     with col3:
-        if st.button("🤖 AI Features", help="Explore AI-powered insights"):
-            st.session_state.show_ai_features = True
-            st.rerun()
+        st.button(
+            "🤖 AI Features",
+            help="Explore AI-powered insights",
+            on_click=show_ai_features,
+        )
 
     if st.session_state.get("show_ai_features", False):
         st.markdown('<div class="ai-section">', unsafe_allow_html=True)
@@ -72,118 +84,186 @@ def display_movie_details(movie_id: str, api_client, ai_client):
         )
 
         with tab1:
-            if st.button("🔍 Generate AI Summary", key="summary_btn"):
-                if movie.get("Plot"):
-                    with st.spinner("Generating summary..."):
-                        summary = ai_client.generate_summary(movie["Plot"])
-                        st.markdown(f"**AI Summary:**")
-                        st.write(summary)
-                        st.markdown(
-                            '<p class="ai-disclaimer">🤖 AI-generated • May be imperfect</p>',
-                            unsafe_allow_html=True,
-                        )
+            display_summary_tab(movie_id, movie, api_client, ai_client)
 
         with tab2:
-            if st.button("💡 Generate Recommendation", key="why_watch_btn"):
-                if movie.get("Plot"):
-                    with st.spinner("Generating recommendation..."):
-                        why_watch = ai_client.generate_why_watch(
-                            movie.get("Title", ""),
-                            movie.get("Plot", ""),
-                            movie.get("Genre", ""),
-                        )
-                        st.markdown(f"**Why You Should Watch:**")
-                        st.write(why_watch)
-                        st.markdown(
-                            '<p class="ai-disclaimer">🤖 AI-generated • May be imperfect</p>',
-                            unsafe_allow_html=True,
-                        )
+            display_why_watch_tab(movie_id, movie, api_client, ai_client)
 
         with tab3:
-            mood = st.selectbox(
-                "Select Mood:",
-                [
-                    "general",
-                    "date night",
-                    "family",
-                    "action",
-                    "horror",
-                    "comedy",
-                    "thriller",
-                    "drama",
-                ],
+            display_similar_tab(movie_id, movie, api_client, ai_client)
+
+        with tab4:
+            display_chat_panel(movie_id, movie, api_client, ai_client)
+
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    st.markdown("</div>", unsafe_allow_html=True)
+
+
+@st.fragment
+def display_summary_tab(movie_id: str, movie: Dict, api_client, ai_client):
+    generate = st.button("🔍 Generate AI Summary", key="summary_btn")
+    regenerate = st.button(
+        "🔄 Regenerate", key="summary_regen_btn", help="Ask Gemini again"
+    )
+    if generate or regenerate:
+        if movie.get("Plot"):
+            with st.spinner("Generating summary..."):
+                insights = ai_client.generate_insights(movie, regenerate=regenerate)
+            if "error" in insights:
+                st.error(insights["error"])
+            else:
+                st.markdown(f"**AI Summary:**")
+                st.write(insights["summary"])
+            st.markdown(
+                '<p class="ai-disclaimer">🤖 AI-generated • May be imperfect</p>',
+                unsafe_allow_html=True,
+            )
+
+
+@st.fragment
+def display_why_watch_tab(movie_id: str, movie: Dict, api_client, ai_client):
+    generate = st.button("💡 Generate Recommendation", key="why_watch_btn")
+    regenerate = st.button(
+        "🔄 Regenerate", key="why_watch_regen_btn", help="Ask Gemini again"
+    )
+    if generate or regenerate:
+        if movie.get("Plot"):
+            with st.spinner("Generating recommendation..."):
+                insights = ai_client.generate_insights(
+                    movie, regenerate=regenerate, priority="why_watch"
+                )
+            if "error" in insights:
+                st.error(insights["error"])
+            else:
+                st.markdown(f"**Why You Should Watch:**")
+                st.write(insights["why_watch"])
+            st.markdown(
+                '<p class="ai-disclaimer">🤖 AI-generated • May be imperfect</p>',
+                unsafe_allow_html=True,
+            )
+
+
+def display_similar_tab(movie_id: str, movie: Dict, api_client, ai_client):
+    # Not a fragment: its cards select another title, which needs the whole
+    # page, so a fragment run would always be followed by a second full run.
+    picks = local_similar("movie", movie_id)
+    if picks:
+        st.markdown("**⚡ Instant picks from titles browsed here:**")
+        if st.checkbox(
+            "Re-rank with AI",
+            key=f"local_rerank_{movie_id}",
+            help="Let Gemini reorder these picks",
+        ):
+            with st.spinner("Re-ranking..."):
+                ranked = ai_client.rerank_similar(
+                    movie, [pick["raw"] for pick in picks]
+                )
+            picks = [normalize_movie(record) for record in ranked]
+        display_result_grid(picks, f"local_similar_{movie_id}_")
+        st.markdown("---")
+
+    mood = st.selectbox(
+        "Select Mood:",
+        [
+            "general",
+            "date night",
+            "family",
+            "action",
+            "horror",
+            "comedy",
+            "thriller",
+            "drama",
+        ],
+    )
+    generate = st.button("🎯 Find Similar Movies", key="similar_btn")
+    regenerate = st.button(
+        "🔄 Regenerate", key="similar_regen_btn", help="Ask Gemini again"
+    )
+    similar_key = f"similar_{movie_id}"
+    if generate or regenerate:
+        with st.spinner("Finding similar movies..."):
+            recommendations = ai_client.recommend_similar(
+                movie, mood, regenerate=regenerate
             )
-            if st.button("🎯 Find Similar Movies", key="similar_btn"):
-                with st.spinner("Finding similar movies..."):
-                    recommendations = ai_client.generate_similar_recommendations(
-                        movie.get("Title", ""), movie.get("Genre", ""), mood
+            if "error" in recommendations:
+                st.error(recommendations["error"])
+                st.session_state.pop(similar_key, None)
+            else:
+                st.session_state[similar_key] = {
+                    "mood": mood,
+                    "results": resolve_titles(
+                        recommendations["recommendations"], "movie", api_client
+                    ),
+                }
+
+    # Kept in session state so the cards' buttons survive the rerun
+    # they trigger.
+    similar = st.session_state.get(similar_key)
+    if similar:
+        st.markdown(f"**Similar Movies for {similar['mood']} mood:**")
+        display_similar_results(similar["results"], f"similar_{movie_id}_")
+        st.markdown(
+            '<p class="ai-disclaimer">🤖 AI-generated • May be imperfect</p>',
+            unsafe_allow_html=True,
+        )
+
+
+@st.fragment
+def display_chat_panel(movie_id: str, movie: Dict, api_client, ai_client):
+    st.markdown("### 💬 Chat about this Movie")
+
+    if not ai_client.has_chat(movie_id):
+        movie_context = f"{movie.get('Title', 'Unknown')} ({movie.get('Year', 'Unknown')}): {movie.get('Plot', 'No plot available')}"
+        if not start_chat(ai_client, movie_id, movie_context):
+            st.error("Failed to initialize chat")
+
+    if ai_client.has_chat(movie_id):
+        if f"chat_history_{movie_id}" in st.session_state:
+            for chat in st.session_state[f"chat_history_{movie_id}"]:
+                if chat["role"] == "user":
+                    st.markdown(
+                        f'<div class="chat-message user-message"><strong>You:</strong> {chat["message"]}</div>',
+                        unsafe_allow_html=True,
                     )
-                    st.markdown(f"**Similar Movies for {mood} mood:**")
-                    for rec in recommendations:
-                        if rec.strip():
-                            st.write(rec)
+                else:
                     st.markdown(
-                        '<p class="ai-disclaimer">🤖 AI-generated • May be imperfect</p>',
+                        f'<div class="chat-message ai-message"><strong>AI:</strong> {chat["message"]}</div>',
                         unsafe_allow_html=True,
                     )
 
-        with tab4:
-            st.markdown("### 💬 Chat about this Movie")
+        stream_pending_reply(ai_client, movie_id)
 
-            if f"chat_initialized_{movie_id}" not in st.session_state:
-                movie_context = f"{movie.get('Title', 'Unknown')} ({movie.get('Year', 'Unknown')}): {movie.get('Plot', 'No plot available')}"
-                if ai_client.initialize_chat(movie_context):
-                    st.session_state[f"chat_initialized_{movie_id}"] = True
-                    st.session_state[f"chat_history_{movie_id}"] = []
-                else:
-                    st.error("Failed to initialize chat")
-
-            if f"chat_initialized_{movie_id}" in st.session_state:
-                if f"chat_history_{movie_id}" in st.session_state:
-                    for chat in st.session_state[f"chat_history_{movie_id}"]:
-                        if chat["role"] == "user":
-                            st.markdown(
-                                f'<div class="chat-message user-message"><strong>You:</strong> {chat["message"]}</div>',
-                                unsafe_allow_html=True,
-                            )
-                        else:
-                            st.markdown(
-                                f'<div class="chat-message ai-message"><strong>AI:</strong> {chat["message"]}</div>',
-                                unsafe_allow_html=True,
-                            )
-
-                user_question = st.text_input(
-                    "Ask anything about this movie:",
-                    placeholder="e.g., What's the main theme? Who are the main characters?",
-                    key=f"chat_input_{movie_id}",
-                )
+        st.text_input(
+            "Ask anything about this movie:",
+            placeholder="e.g., What's the main theme? Who are the main characters?",
+            key=f"chat_input_{movie_id}",
+        )
 
-                col1, col2 = st.columns([1, 4])
-                with col1:
-                    if st.button("💬 Send", key=f"chat_send_{movie_id}"):
-                        if user_question.strip():
-                            st.session_state[f"chat_history_{movie_id}"].append(
-                                {"role": "user", "message": user_question}
-                            )
-
-                            with st.spinner("AI is thinking..."):
-                                ai_response = ai_client.chat_about_movie(user_question)
-                                st.session_state[f"chat_history_{movie_id}"].append(
-                                    {"role": "ai", "message": ai_response}
-                                )
-
-                            st.rerun()
-
-                with col2:
-                    if st.button("🗑️ Clear Chat", key=f"chat_clear_{movie_id}"):
-                        st.session_state[f"chat_history_{movie_id}"] = []
-                        st.rerun()
-
-                st.markdown(
-                    '<p class="ai-disclaimer">💬 Chat powered by Google Gemini • Responses may be imperfect</p>',
-                    unsafe_allow_html=True,
-                )
+        col1, col2 = st.columns([1, 4])
+        with col1:
+            st.button(
+                "💬 Send",
+                key=f"chat_send_{movie_id}",
+                on_click=queue_chat_message,
+                args=(movie_id, f"chat_input_{movie_id}"),
+            )
 
-        st.markdown("</div>", unsafe_allow_html=True)
+        with col2:
+            st.button(
+                "🗑️ Clear Chat",
+                key=f"chat_clear_{movie_id}",
+                on_click=clear_chat,
+                args=(ai_client, movie_id),
+            )
 
-    st.markdown("</div>", unsafe_allow_html=True)
+        turns = ai_client.chat_turns(movie_id)
+        if turns:
+            last_turn = turns[-1]
+            note = " • earlier turns summarized" if last_turn["compacted"] else ""
+            st.caption(f"🧮 Last prompt: {last_turn['prompt_tokens']} tokens{note}")
+
+        st.markdown(
+            '<p class="ai-disclaimer">💬 Chat powered by Google Gemini • Responses may be imperfect</p>',
+            unsafe_allow_html=True,
+        )
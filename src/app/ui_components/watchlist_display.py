@@ -1,14 +1,55 @@
+import math
 import streamlit as st
 from datetime import datetime
+from typing import Dict
+from app.clients.unified import normalize_anime, normalize_movie
+from app.utils.recommender import get_index
+from app.utils.reruns import mark_action
 from app.utils.watchlist import (
     save_movie_info,
     save_anime_info,
     create_downloadable_txt,
+    get_taste_profile,
+    get_watchlist_owner,
+    remove_from_watchlist,
+    save_to_watchlist,
+    watchlist_counts,
 )
+from app.utils.watchlist_store import get_watchlist_store, item_id
+
+FOR_YOU_COUNT = 6
+PAGE_SIZE = 20
+FILTERS = {"All": None, "Movies": "movie", "Anime": "anime"}
+SORT_OPTIONS = {
+    "Date Added (Newest)": "newest",
+    "Date Added (Oldest)": "oldest",
+    "Title A-Z": "title",
+    "Title Z-A": "title_desc",
+}
+
+
+def remove_item(item: Dict):
+    mark_action("watchlist_remove")
+    if remove_from_watchlist(item):
+        st.session_state.setdefault("watchlist_removed", set()).add(
+            f"{item['type']}_{item_id(item)}"
+        )
+
+
+def restore_item(item: Dict):
+    mark_action("watchlist_undo")
+    save_to_watchlist(item)
+    st.session_state.get("watchlist_removed", set()).discard(
+        f"{item['type']}_{item_id(item)}"
+    )
 
 
 def display_watchlist():
-    if "watchlist" not in st.session_state or not st.session_state.watchlist:
+    # Rows removed in fragment runs are gone from the query by now.
+    st.session_state.watchlist_removed = set()
+    counts = watchlist_counts()
+    total = sum(counts.values())
+    if not total:
         st.markdown(
             """
         <div class="search-container" style="text-align: center; padding: 3rem;">
@@ -21,137 +62,163 @@ def display_watchlist():
         )
         return
 
-    st.markdown(f"### 📚 Your Watchlist ({len(st.session_state.watchlist)} items)")
+    display_for_you()
+
+    st.markdown(f"### 📚 Your Watchlist ({total} items)")
 
     col1, col2, col3 = st.columns(3)
     with col1:
-        filter_type = st.selectbox("Filter by type:", ["All", "Movies", "Anime"])
+        filter_type = st.selectbox("Filter by type:", list(FILTERS))
     with col2:
-        sort_by = st.selectbox(
-            "Sort by:",
-            ["Date Added (Newest)", "Date Added (Oldest)", "Title A-Z", "Title Z-A"],
-        )
+        sort_by = st.selectbox("Sort by:", list(SORT_OPTIONS))
     with col3:
         if st.button("📥 Download Full Watchlist"):
             download_full_watchlist()
 
-    filtered_watchlist = st.session_state.watchlist.copy()
-
-    if filter_type == "Movies":
-        filtered_watchlist = [
-            item for item in filtered_watchlist if item["type"] == "movie"
-        ]
-    elif filter_type == "Anime":
-        filtered_watchlist = [
-            item for item in filtered_watchlist if item["type"] == "anime"
-        ]
-
-    if sort_by == "Date Added (Newest)":
-        filtered_watchlist.sort(key=lambda x: x["added_date"], reverse=True)
-    elif sort_by == "Date Added (Oldest)":
-        filtered_watchlist.sort(key=lambda x: x["added_date"])
-    elif sort_by == "Title A-Z":
-        filtered_watchlist.sort(key=lambda x: x["title"].lower())
-    elif sort_by == "Title Z-A":
-        filtered_watchlist.sort(key=lambda x: x["title"].lower(), reverse=True)
-
-    for i, item in enumerate(filtered_watchlist):
-        st.markdown('<div class="watchlist-item">', unsafe_allow_html=True)
-
-        col1, col2, col3 = st.columns([1, 3, 1])
-
-        with col1:
-            if (
-                item["type"] == "movie"
-                and item.get("poster")
-                and item["poster"] != "N/A"
-            ):
-                st.image(item["poster"], width=100)
-            elif item["type"] == "anime" and item.get("image"):
-                st.image(item["image"], width=100)
-            else:
-                emoji = "🎬" if item["type"] == "movie" else "🎌"
-                st.markdown(
-                    f'<div style="width: 100px; height: 140px; background: linear-gradient(135deg, #374151 0%, #1f2937 100%); border-radius: 8px; display: flex; align-items: center; justify-content: center; font-size: 2rem;">{emoji}</div>',
-                    unsafe_allow_html=True,
-                )
-
-        with col2:
-            st.markdown(f"### {item['title']}")
+    kind = FILTERS[filter_type]
+    matching = counts[kind] if kind else total
+    if not matching:
+        st.info(f"No {filter_type.lower()} in your watchlist yet.")
+        return
+
+    pages = max(1, math.ceil(matching / PAGE_SIZE))
+    page_key = f"watchlist_page_{filter_type}_{sort_by}"
+    # Removing the last item on the last page would leave the widget past
+    # the end; clamp it before it is drawn.
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    page = st.number_input(
+        f"Page (of {pages}):", min_value=1, max_value=pages, step=1, key=page_key
+    )
+    start = (page - 1) * PAGE_SIZE
+    end = min(start + PAGE_SIZE, matching)
+    st.caption(f"Showing {start + 1}–{end} of {matching}")
+
+    # Only the visible page is read and rendered; filtering and ordering are
+    # done by SQLite on the watchlist indexes.
+    page_items = get_watchlist_store().items(
+        get_watchlist_owner(), kind, SORT_OPTIONS[sort_by], PAGE_SIZE, start
+    )
+
+    for item in page_items:
+        display_watchlist_item(item)
+
+
+@st.fragment
+def display_watchlist_item(item: Dict):
+    # Runs as its own fragment: Remove, Undo and Save Info only re-execute
+    # this row, not the page around it.
+    key = f"{item['type']}_{item_id(item)}"
+    if key in st.session_state.get("watchlist_removed", set()):
+        col1, col2 = st.columns([4, 1])
+        col1.caption(f"🗑️ Removed '{item['title']}' from watchlist")
+        col2.button("↩️ Undo", key=f"undo_{key}", on_click=restore_item, args=(item,))
+        return
+
+    st.markdown('<div class="watchlist-item">', unsafe_allow_html=True)
+
+    col1, col2, col3 = st.columns([1, 3, 1])
+
+    with col1:
+        if item["type"] == "movie" and item.get("poster") and item["poster"] != "N/A":
+            st.image(item["poster"], width=100)
+        elif item["type"] == "anime" and item.get("image"):
+            st.image(item["image"], width=100)
+        else:
+            emoji = "🎬" if item["type"] == "movie" else "🎌"
+            st.markdown(
+                f'<div style="width: 100px; height: 140px; background: linear-gradient(135deg, #374151 0%, #1f2937 100%); border-radius: 8px; display: flex; align-items: center; justify-content: center; font-size: 2rem;">{emoji}</div>',
+                unsafe_allow_html=True,
+            )
+
+    with col2:
+        st.markdown(f"### {item['title']}")
+        if item["type"] == "movie":
+            st.markdown(f"**Year:** {item['year']}")
+            st.markdown(f"**Type:** Movie")
+            with st.expander("📖 Plot"):
+                st.write(item["plot"])
+        else:
+            st.markdown(f"**Episodes:** {item['episodes']}")
+            st.markdown(f"**Type:** Anime")
+            with st.expander("📖 Synopsis"):
+                st.write(item["synopsis"])
+
+        st.markdown(f"**Added:** {item['added_date']}")
+
+    with col3:
+        st.markdown("### Actions")
+        st.button(
+            "🗑️ Remove",
+            key=f"remove_{key}",
+            help="Remove from watchlist",
+            on_click=remove_item,
+            args=(item,),
+        )
+
+        if st.button(
+            "📥 Save Info",
+            key=f"save_{key}",
+            help="Download item info",
+        ):
             if item["type"] == "movie":
-                st.markdown(f"**Year:** {item['year']}")
-                st.markdown(f"**Type:** Movie")
-                with st.expander("📖 Plot"):
-                    st.write(item["plot"])
+                movie_data = {
+                    "Title": item["title"],
+                    "Year": item["year"],
+                    "Plot": item["plot"],
+                    "Poster": item.get("poster", ""),
+                    "imdbRating": item.get("imdbRating", "Unknown"),
+                    "Director": item.get("Director", "Unknown"),
+                    "Actors": item.get("Actors", "Unknown"),
+                    "Genre": item.get("Genre", "Unknown"),
+                    "Runtime": item.get("Runtime", "Unknown"),
+                }
+                save_movie_info(movie_data)
             else:
-                st.markdown(f"**Episodes:** {item['episodes']}")
-                st.markdown(f"**Type:** Anime")
-                with st.expander("📖 Synopsis"):
-                    st.write(item["synopsis"])
-
-            st.markdown(f"**Added:** {item['added_date']}")
-
-        with col3:
-            st.markdown("### Actions")
-            if st.button(
-                "🗑️ Remove",
-                key=f"remove_{i}_{item['title']}",
-                help="Remove from watchlist",
-            ):
-                for j, orig_item in enumerate(st.session_state.watchlist):
-                    if (
-                        orig_item["title"] == item["title"]
-                        and orig_item["added_date"] == item["added_date"]
-                    ):
-                        st.session_state.watchlist.pop(j)
-                        st.success(f"Removed '{item['title']}' from watchlist")
-                        st.rerun()
-                        break
-
-            if st.button(
-                "📥 Save Info",
-                key=f"save_{i}_{item['title']}",
-                help="Download item info",
-            ):
-                if item["type"] == "movie":
-                    movie_data = {
-                        "Title": item["title"],
-                        "Year": item["year"],
-                        "Plot": item["plot"],
-                        "Poster": item.get("poster", ""),
-                        "imdbRating": item.get("imdbRating", "Unknown"),
-                        "Director": item.get("Director", "Unknown"),
-                        "Actors": item.get("Actors", "Unknown"),
-                        "Genre": item.get("Genre", "Unknown"),
-                        "Runtime": item.get("Runtime", "Unknown"),
-                    }
-                    save_movie_info(movie_data)
-                else:
-                    anime_data = {
-                        "title": item["title"],
-                        "episodes": item["episodes"],
-                        "synopsis": item["synopsis"],
-                        "status": item.get("status", "Unknown"),
-                        "score": item.get("score", "N/A"),
-                        "studios": item.get("studios", []),
-                        "genres": item.get("genres", []),
-                    }
-                    save_anime_info(anime_data)
-
-        st.markdown("</div>", unsafe_allow_html=True)
+                anime_data = {
+                    "title": item["title"],
+                    "episodes": item["episodes"],
+                    "synopsis": item["synopsis"],
+                    "status": item.get("status", "Unknown"),
+                    "score": item.get("score", "N/A"),
+                    "studios": item.get("studios", []),
+                    "genres": item.get("genres", []),
+                }
+                save_anime_info(anime_data)
+
+    st.markdown("</div>", unsafe_allow_html=True)
+
+
+def display_for_you():
+    # Candidates are the titles this server has already fetched, scored
+    # against the watchlist's taste vector in one vectorized pass.
+    picks = get_index().recommend(get_taste_profile(), FOR_YOU_COUNT)
+    if not picks:
+        return
+
+    st.markdown("### ✨ For You")
+    columns = st.columns(len(picks))
+    for column, (_, kind, record) in zip(columns, picks):
+        result = normalize_movie(record) if kind == "movie" else normalize_anime(record)
+        with column:
+            if result["image"]:
+                st.image(result["image"], width=120)
+            st.markdown(f"**{result['title']}**")
+            st.caption(f"{'🎬' if kind == 'movie' else '🎌'} {result['year']}")
 
 
 def download_full_watchlist():
+    store, owner = get_watchlist_store(), get_watchlist_owner()
+    movies = store.items(owner, "movie", "oldest")
+    anime = store.items(owner, "anime", "oldest")
+
     watchlist_content = f"""📚 MY COMPLETE WATCHLIST
 {'='*60}
 Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-Total Items: {len(st.session_state.watchlist)}
+Total Items: {len(movies) + len(anime)}
 
 """
 
-    movies = [item for item in st.session_state.watchlist if item["type"] == "movie"]
-    anime = [item for item in st.session_state.watchlist if item["type"] == "anime"]
-
     if movies:
         watchlist_content += f"\n🎬 MOVIES ({len(movies)} items)\n" + "-" * 40 + "\n"
         for i, item in enumerate(movies, 1):
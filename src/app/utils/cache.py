@@ -0,0 +1,385 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+from app.utils.singleflight import SingleFlight
+
+MISSING = object()
+
+DEFAULT_CACHE_DIR = ".novara_cache"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.split()).casefold()
+
+
+def load_once(
+    cache: "CacheBackend", flight: SingleFlight, key: Hashable, fetch: Callable
+) -> Any:
+    # Cache, then one upstream call per key however many callers miss at once.
+    # The leader checks the cache again: a caller that missed just as the
+    # previous flight finished finds its result there instead of fetching.
+    # That second look is a peek, so each call counts once in the stats.
+    cached = cache.get(key)
+    if cached is not MISSING:
+        return cached
+
+    def fetch_unless_cached():
+        cached = cache.peek(key)
+        return fetch() if cached is MISSING else cached
+
+    return flight.do(key, fetch_unless_cached)
+
+
+async def load_once_async(
+    cache: "CacheBackend", flight: SingleFlight, key: Hashable, fetch: Callable
+) -> Any:
+    # load_once for coroutines. Backends do blocking SQLite/file I/O, so
+    # lookups run in the loop's executor instead of on the event loop.
+    loop = asyncio.get_running_loop()
+    cached = await loop.run_in_executor(None, cache.get, key)
+    if cached is not MISSING:
+        return cached
+
+    async def fetch_unless_cached():
+        cached = await loop.run_in_executor(None, cache.peek, key)
+        return await fetch() if cached is MISSING else cached
+
+    return await flight.do_async(key, fetch_unless_cached)
+
+
+def _encode_key(key: Hashable) -> str:
+    if isinstance(key, tuple):
+        key = list(key)
+    return json.dumps(key, sort_keys=True, default=str)
+
+
+class CacheBackend(ABC):
+    def __init__(self, ttl: float = 600):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def peek(self, key: Hashable) -> Any:
+        # Like get(), but not counted in the hit/miss stats.
+        ...
+
+    def get(self, key: Hashable) -> Any:
+        value = self.peek(key)
+        self._record(value is not MISSING)
+        return value
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ...
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    def _record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _expiry(self, ttl: Optional[float]) -> float:
+        return time.time() + (self.ttl if ttl is None else ttl)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self)}
+
+
+class TTLCache(CacheBackend):
+    def __init__(self, maxsize: int = 256, ttl: float = 600):
+        super().__init__(ttl)
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def peek(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISSING
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return MISSING
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache(CacheBackend):
+    def __init__(
+        self,
+        path: str,
+        namespace: str,
+        ttl: float = 600,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        evict_every: int = 50,
+    ):
+        super().__init__(ttl)
+        self.path = path
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.evict_every = evict_every
+        self._writes = 0
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS cache (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )"""
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS cache_accessed ON cache (namespace, accessed_at)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS cache_expires ON cache (namespace, expires_at)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def peek(self, key: Hashable) -> Any:
+        conn = self._connect()
+        encoded = _encode_key(key)
+        row = conn.execute(
+            "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+            (self.namespace, encoded),
+        ).fetchone()
+        now = time.time()
+        if row is None or row[1] <= now:
+            return MISSING
+
+        conn.execute(
+            "UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+            (now, self.namespace, encoded),
+        )
+        return json.loads(gzip.decompress(row[0]))
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        blob = gzip.compress(json.dumps(value).encode())
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                self.namespace,
+                _encode_key(key),
+                blob,
+                len(blob),
+                self._expiry(ttl),
+                time.time(),
+            ),
+        )
+        # Eviction scans the namespace, so it runs every few writes instead of
+        # on every cache miss; the size limit is a soft one either way.
+        with self._lock:
+            self._writes += 1
+            should_evict = self._writes % self.evict_every == 0
+        if should_evict:
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        conn.execute(
+            "DELETE FROM cache WHERE namespace = ? AND expires_at <= ?",
+            (self.namespace, time.time()),
+        )
+        total = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM cache WHERE namespace = ?",
+            (self.namespace,),
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT key, size FROM cache WHERE namespace = ? ORDER BY accessed_at",
+                (self.namespace,),
+            ).fetchall()
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                conn.execute(
+                    "DELETE FROM cache WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                )
+                total -= size
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def clear(self):
+        self._connect().execute(
+            "DELETE FROM cache WHERE namespace = ?", (self.namespace,)
+        )
+
+    def __len__(self) -> int:
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)
+        ).fetchone()[0]
+
+
+class FileCache(CacheBackend):
+    def __init__(
+        self,
+        directory: str,
+        ttl: float = 600,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        evict_every: int = 50,
+    ):
+        super().__init__(ttl)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.evict_every = evict_every
+        self._writes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: Hashable) -> str:
+        digest = hashlib.sha256(_encode_key(key).encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json.gz")
+
+    def peek(self, key: Hashable) -> Any:
+        path = self._path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return MISSING
+
+        if entry["expires_at"] <= time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return MISSING
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry["value"]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        entry = {"expires_at": self._expiry(ttl), "value": value}
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(json.dumps(entry).encode()))
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        with self._lock:
+            self._writes += 1
+            should_evict = self._writes % self.evict_every == 0
+        if should_evict:
+            self._evict()
+
+    def _entries(self):
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json.gz"):
+                try:
+                    yield entry.path, entry.stat()
+                except OSError:
+                    continue
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda item: item[1].st_mtime)
+        total = sum(stat.st_size for _, stat in entries)
+        for path, stat in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= stat.st_size
+
+    def clear(self):
+        for path, _ in list(self._entries()):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._entries())
+
+
+_backends: Dict[str, CacheBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_cache(namespace: str, maxsize: int = 512, ttl: float = 600) -> CacheBackend:
+    with _backends_lock:
+        if namespace in _backends:
+            return _backends[namespace]
+
+        kind = os.getenv("NOVARA_CACHE_BACKEND", "memory").lower()
+        directory = os.getenv("NOVARA_CACHE_DIR", DEFAULT_CACHE_DIR)
+        max_bytes = int(os.getenv("NOVARA_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+
+        if kind == "sqlite":
+            os.makedirs(directory, exist_ok=True)
+            backend = SQLiteCache(
+                os.path.join(directory, "cache.sqlite3"), namespace, ttl, max_bytes
+            )
+        elif kind == "files":
+            backend = FileCache(os.path.join(directory, namespace), ttl, max_bytes)
+        else:
+            backend = TTLCache(maxsize, ttl)
+
+        _backends[namespace] = backend
+        return backend
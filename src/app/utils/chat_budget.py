@@ -0,0 +1,67 @@
+from typing import Dict, List, Sequence, Tuple
+
+CHARS_PER_TOKEN = 4
+CHAT_TOKEN_BUDGET = 3000
+KEEP_RECENT_MESSAGES = 6
+
+
+def estimate_tokens(text: str) -> int:
+    # Local heuristic (~4 characters per token for English) so budgeting a
+    # turn never costs a count_tokens round-trip.
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def content_role(content) -> str:
+    if isinstance(content, dict):
+        return content.get("role", "")
+    return getattr(content, "role", "")
+
+
+def content_text(content) -> str:
+    parts = content.get("parts", []) if isinstance(content, dict) else content.parts
+    texts = []
+    for part in parts:
+        texts.append(part if isinstance(part, str) else getattr(part, "text", ""))
+    return "".join(texts)
+
+
+class TokenBudget:
+    def __init__(
+        self,
+        budget: int = CHAT_TOKEN_BUDGET,
+        keep_recent: int = KEEP_RECENT_MESSAGES,
+    ):
+        self.budget = budget
+        self.keep_recent = keep_recent
+
+    def history_tokens(self, history: Sequence) -> int:
+        return sum(estimate_tokens(content_text(content)) for content in history)
+
+    def prompt_tokens(self, history: Sequence, message: str) -> int:
+        return self.history_tokens(history) + estimate_tokens(message)
+
+    def split(self, history: Sequence, seed_length: int) -> Tuple[List, List]:
+        # Returns (older turns to fold into the summary, recent turns to keep
+        # verbatim). The seeded context exchange is never part of either.
+        turns = list(history[seed_length:])
+        keep = self.keep_recent if self.keep_recent % 2 == 0 else self.keep_recent + 1
+        return turns[:-keep] if len(turns) > keep else [], turns[-keep:]
+
+    def over_budget(self, history: Sequence, message: str) -> bool:
+        return self.prompt_tokens(history, message) > self.budget
+
+
+def format_transcript(turns: Sequence) -> str:
+    lines = []
+    for content in turns:
+        speaker = "User" if content_role(content) == "user" else "AI"
+        lines.append(f"{speaker}: {content_text(content)}")
+    return "\n".join(lines)
+
+
+def turn_report(estimated: int, actual: int, compacted: bool) -> Dict:
+    return {
+        "estimated_tokens": estimated,
+        "prompt_tokens": actual or estimated,
+        "compacted": compacted,
+    }
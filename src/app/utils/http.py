@@ -0,0 +1,31 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 32
+
+
+class PooledSession:
+    def __init__(
+        self, pool_connections: int = POOL_CONNECTIONS, pool_maxsize: int = POOL_MAXSIZE
+    ):
+        # One adapter (and so one urllib3 pool of keep-alive connections) is
+        # shared by every thread; each thread gets its own Session on top of
+        # it because Session itself is not thread-safe.
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize
+        )
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.mount("https://", self.adapter)
+            session.mount("http://", self.adapter)
+            self._local.session = session
+        return session
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self._session().get(url, **kwargs)
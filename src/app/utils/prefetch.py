@@ -0,0 +1,16 @@
+from concurrent.futures import Future
+from typing import Iterable
+
+
+class PrefetchBatch:
+    # Warm-up work the caller may abandon: results land in the clients'
+    # caches, so nothing reads the futures except to cancel them.
+    def __init__(self, futures: Iterable[Future] = ()):
+        self.futures = list(futures)
+
+    def cancel(self):
+        for future in self.futures:
+            future.cancel()
+
+    def done(self) -> bool:
+        return all(future.done() for future in self.futures)
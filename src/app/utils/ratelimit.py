@@ -0,0 +1,86 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional, Sequence
+
+
+class RateLimitExceeded(Exception):
+    pass
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float):
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    def wait_time(self) -> float:
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class RateLimiter:
+    def __init__(self, buckets: Sequence[TokenBucket], max_wait: float = 30):
+        self.buckets = list(buckets)
+        self.max_wait = max_wait
+        self.waiting = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, max_wait: Optional[float] = None) -> float:
+        max_wait = self.max_wait if max_wait is None else max_wait
+        with self._lock:
+            now = time.monotonic()
+            for bucket in self.buckets:
+                bucket.refill(now)
+
+            wait = max(bucket.wait_time() for bucket in self.buckets)
+            if wait > max_wait:
+                raise RateLimitExceeded(
+                    f"Rate limit queue is full (next slot in {wait:.1f}s)"
+                )
+
+            # Tokens may go negative: each caller reserves its slot in order,
+            # so bursts are queued and released at the bucket rate.
+            for bucket in self.buckets:
+                bucket.tokens -= 1
+            self.waiting += 1
+
+        try:
+            if wait > 0:
+                time.sleep(wait)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        return wait
+
+    def penalize(self, delay: float):
+        with self._lock:
+            now = time.monotonic()
+            for bucket in self.buckets:
+                bucket.refill(now)
+                bucket.tokens = min(bucket.tokens, 1 - bucket.rate * delay)
+
+
+def backoff_delay(
+    attempt: int,
+    retry_after: Optional[str] = None,
+    base: float = 0.5,
+    cap: float = 10,
+) -> float:
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                delay = None
+        if delay is not None:
+            return max(0.0, delay) + random.uniform(0, base)
+    return random.uniform(0, min(cap, base * 2**attempt))
@@ -0,0 +1,345 @@
+import math
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+TEXT_DIM = 1024
+GENRE_DIM = 64
+INITIAL_CAPACITY = 256
+# Each row is ~4 KB of term counts plus its record; past this many titles the
+# least recently used ones are evicted and their rows reused.
+MAX_ROWS = int(os.getenv("NOVARA_RECOMMENDER_MAX_ROWS", 10_000))
+TOP_K = 5
+# How much each feature group contributes to the final similarity.
+WEIGHTS = {"text": 0.55, "genre": 0.3, "year": 0.1, "score": 0.05}
+YEAR_SCALE = 30.0
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have he her his in into is it "
+    "its of on or she that the their them they this to was were when where "
+    "which while who will with after before about".split()
+)
+
+
+def _bucket(token: str, dim: int) -> int:
+    # crc32 rather than hash() so bucket ids don't change between processes.
+    return zlib.crc32(token.encode()) % dim
+
+
+def tokenize(text: str) -> List[str]:
+    return [
+        token
+        for token in _TOKEN.findall(text.casefold())
+        if len(token) > 2 and token not in STOPWORDS
+    ]
+
+
+def _parse_year(value) -> Optional[float]:
+    match = re.search(r"\d{4}", str(value or ""))
+    return float(match.group()) if match else None
+
+
+def _parse_score(value) -> Optional[float]:
+    try:
+        score = float(value)
+    except (TypeError, ValueError):
+        return None
+    return score if not math.isnan(score) else None
+
+
+def movie_features(movie: Dict) -> Dict:
+    return {
+        "title": movie.get("Title", ""),
+        "text": " ".join(
+            movie.get(field) or ""
+            for field in ("Plot", "Director", "Actors")
+            if movie.get(field) != "N/A"
+        ),
+        "genres": [
+            genre.strip()
+            for genre in (movie.get("Genre") or "").split(",")
+            if genre.strip()
+        ],
+        "year": _parse_year(movie.get("Year")),
+        "score": _parse_score(movie.get("imdbRating")),
+    }
+
+
+def anime_features(anime: Dict) -> Dict:
+    aired = (anime.get("aired") or {}).get("prop", {}).get("from", {})
+    genres = anime.get("genres", []) + anime.get("themes", [])
+    return {
+        "title": anime.get("title", ""),
+        "text": anime.get("synopsis") or "",
+        "genres": [genre["name"] for genre in genres if genre.get("name")],
+        "year": _parse_year(anime.get("year") or aired.get("year")),
+        "score": _parse_score(anime.get("score")),
+    }
+
+
+FEATURES = {"movie": movie_features, "anime": anime_features}
+KINDS = ("movie", "anime")
+
+
+def vectorize(features: Dict) -> Tuple[np.ndarray, np.ndarray, float, float]:
+    counts = np.zeros(TEXT_DIM, dtype=np.float32)
+    for token in tokenize(features["title"] + " " + features["text"]):
+        counts[_bucket(token, TEXT_DIM)] += 1
+    genres = np.zeros(GENRE_DIM, dtype=np.float32)
+    for genre in features["genres"]:
+        genres[_bucket(genre.casefold(), GENRE_DIM)] = 1
+    year, score = features["year"], features["score"]
+    # Sublinear tf so a word repeated in a long synopsis doesn't dominate.
+    return (
+        np.log1p(counts),
+        genres,
+        np.nan if year is None else year,
+        np.nan if score is None else score,
+    )
+
+
+class ContentIndex:
+    # Rows are appended as detail records arrive, so the index grows in place
+    # (amortised doubling) instead of being rebuilt. Term counts are stored
+    # raw; IDF weighting is applied at query time from the running document
+    # frequencies, which keeps every insert O(tokens). Once max_rows titles
+    # are indexed, each new one replaces the least recently used.
+    def __init__(self, capacity: int = INITIAL_CAPACITY, max_rows: int = MAX_ROWS):
+        self.size = 0
+        self.max_rows = max_rows
+        self.evictions = 0
+        self._version = 0
+        capacity = min(capacity, max_rows)
+        self._tf = np.zeros((capacity, TEXT_DIM), dtype=np.float32)
+        self._genres = np.zeros((capacity, GENRE_DIM), dtype=np.float32)
+        self._year = np.full(capacity, np.nan, dtype=np.float32)
+        self._score = np.full(capacity, np.nan, dtype=np.float32)
+        self._genre_norm = np.zeros(capacity, dtype=np.float32)
+        self._kind = np.zeros(capacity, dtype=np.int8)
+        self._weights_cache: Tuple = (None, None, None)
+        self._df = np.zeros(TEXT_DIM, dtype=np.float32)
+        self._records: List[Dict] = []
+        # Ordered oldest to most recently added or looked up.
+        self._rows: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._rows
+
+    def _grow(self):
+        capacity = min(self._tf.shape[0] * 2, self.max_rows)
+        for name in ("_tf", "_genres", "_genre_norm", "_year", "_score", "_kind"):
+            old = getattr(self, name)
+            fill = np.nan if name in ("_year", "_score") else 0
+            new = np.full((capacity,) + old.shape[1:], fill, dtype=old.dtype)
+            new[: self.size] = old[: self.size]
+            setattr(self, name, new)
+
+    def _touch(self, key: Tuple[str, str]) -> bool:
+        # Titles served again (details reopened, searched again) count as
+        # recently used, so eviction drops what nobody has looked at.
+        with self._lock:
+            if key not in self._rows:
+                return False
+            self._rows.move_to_end(key)
+            return True
+
+    def add(self, kind: str, item_id, record: Dict) -> bool:
+        key = (kind, str(item_id))
+        if not item_id or self._touch(key):
+            return False
+
+        tf, genres, year, score = vectorize(FEATURES[kind](record))
+        with self._lock:
+            if key in self._rows:
+                return False
+            if self.size == self.max_rows:
+                _, row = self._rows.popitem(last=False)
+                self._df -= self._tf[row] > 0
+                self.evictions += 1
+            else:
+                if self.size == self._tf.shape[0]:
+                    self._grow()
+                row = self.size
+                self._records.append(record)
+                self.size += 1
+            self._tf[row] = tf
+            self._genres[row] = genres
+            self._genre_norm[row] = np.linalg.norm(genres)
+            self._year[row] = year
+            self._score[row] = score
+            self._kind[row] = KINDS.index(kind)
+            self._df += tf > 0
+            self._records[row] = record
+            self._rows[key] = row
+            self._version += 1
+        return True
+
+    def add_movie(self, movie: Dict) -> bool:
+        if movie.get("Response") == "False":
+            return False
+        return self.add("movie", movie.get("imdbID"), movie)
+
+    def add_anime(self, anime: Dict) -> bool:
+        return self.add("anime", anime.get("mal_id"), anime)
+
+    def _weights(self) -> Tuple[np.ndarray, np.ndarray]:
+        # idf² and the idf-weighted row norms only change when a row is added
+        # or replaced, so they are cached per index version instead of
+        # recomputed per query.
+        if self._weights_cache[0] != self._version:
+            rows = self._tf[: self.size]
+            idf = np.log((1 + self.size) / (1 + self._df)) + 1
+            idf2 = idf * idf
+            norms = np.sqrt(np.einsum("ij,ij,j->i", rows, rows, idf2))
+            self._weights_cache = (self._version, idf2, norms)
+        return self._weights_cache[1:]
+
+    def _scores(
+        self, tf: np.ndarray, genres: np.ndarray, year: float, score: float
+    ) -> np.ndarray:
+        # Cosine over idf-weighted rows without materialising the weighted
+        # matrix: both the dot products and the norms fold idf in as idf².
+        idf2, norms = self._weights()
+        dots = self._tf[: self.size] @ (tf * idf2)
+        denom = norms * np.sqrt(np.dot(tf * tf, idf2))
+        text = np.divide(dots, denom, out=np.zeros_like(dots), where=denom > 0)
+
+        overlap = self._genres[: self.size] @ genres
+        denom = self._genre_norm[: self.size] * np.linalg.norm(genres)
+        genre = np.divide(overlap, denom, out=np.zeros_like(overlap), where=denom > 0)
+
+        # Missing years/scores contribute nothing rather than a penalty.
+        year_gap = np.abs(self._year[: self.size] - year) / YEAR_SCALE
+        score_gap = np.abs(self._score[: self.size] - score) / 10
+        return (
+            WEIGHTS["text"] * text
+            + WEIGHTS["genre"] * genre
+            + WEIGHTS["year"] * np.nan_to_num(np.clip(1 - year_gap, 0, 1))
+            + WEIGHTS["score"] * np.nan_to_num(np.clip(1 - score_gap, 0, 1))
+        )
+
+    def _top(self, scores: np.ndarray, k: int) -> List[Tuple[float, str, Dict]]:
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            (float(scores[i]), KINDS[self._kind[i]], self._records[i]) for i in top
+        ]
+
+    def similar(
+        self, kind: str, item_id, k: int = TOP_K, same_kind: bool = True
+    ) -> List[Tuple[float, str, Dict]]:
+        with self._lock:
+            key = (kind, str(item_id))
+            row = self._rows.get(key)
+            if row is None:
+                return []
+            self._rows.move_to_end(key)
+
+            scores = self._scores(
+                self._tf[row], self._genres[row], self._year[row], self._score[row]
+            )
+            scores[row] = -np.inf
+            if same_kind:
+                scores[self._kind[: self.size] != KINDS.index(kind)] = -np.inf
+            return self._top(scores, k)
+
+    def recommend(
+        self, profile: "TasteProfile", k: int = TOP_K
+    ) -> List[Tuple[float, str, Dict]]:
+        with self._lock:
+            if not profile or not self.size:
+                return []
+
+            scores = self._scores(*profile.query())
+            # Titles already on the watchlist are not recommendations.
+            for key in profile:
+                row = self._rows.get(key)
+                if row is not None:
+                    scores[row] = -np.inf
+            return self._top(scores, k)
+
+
+class TasteProfile:
+    # Running sums over the watchlist, so adding or removing an item is
+    # O(features) and the query vector is just the current mean. Each item's
+    # contribution is kept to subtract it again on removal.
+    def __init__(self):
+        self._tf = np.zeros(TEXT_DIM, dtype=np.float64)
+        self._genres = np.zeros(GENRE_DIM, dtype=np.float64)
+        self._year = [0.0, 0]
+        self._score = [0.0, 0]
+        self._members: Dict[Tuple[str, str], Tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __iter__(self):
+        return iter(list(self._members))
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._members
+
+    def _apply(self, contribution: Tuple, sign: int):
+        tf, genres, year, score = contribution
+        self._tf += sign * tf
+        self._genres += sign * genres
+        for total, value in ((self._year, year), (self._score, score)):
+            if not math.isnan(value):
+                total[0] += sign * value
+                total[1] += sign
+
+    def add(self, kind: str, item_id, features: Dict) -> bool:
+        key = (kind, str(item_id))
+        if key in self._members:
+            return False
+        tf, genres, year, score = vectorize(features)
+        # Unit-length text vectors, so a long synopsis counts as much as a
+        # short plot line.
+        norm = np.linalg.norm(tf)
+        contribution = (tf / norm if norm else tf, genres, year, score)
+        self._members[key] = contribution
+        self._apply(contribution, 1)
+        return True
+
+    def remove(self, kind: str, item_id) -> bool:
+        contribution = self._members.pop((kind, str(item_id)), None)
+        if contribution is None:
+            return False
+        self._apply(contribution, -1)
+        return True
+
+    def query(self) -> Tuple[np.ndarray, np.ndarray, float, float]:
+        count = max(len(self._members), 1)
+        year_total, year_count = self._year
+        score_total, score_count = self._score
+        return (
+            (self._tf / count).astype(np.float32),
+            (self._genres / count).astype(np.float32),
+            year_total / year_count if year_count else np.nan,
+            score_total / score_count if score_count else np.nan,
+        )
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> ContentIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = ContentIndex()
+        return _index
@@ -0,0 +1,62 @@
+import os
+import streamlit as st
+from typing import Dict
+
+STATS_KEY = "run_stats"
+
+
+def _stats() -> Dict:
+    return st.session_state.setdefault(
+        STATS_KEY,
+        {
+            "action": None,
+            "interactions": 0,
+            "runs": 0,
+            "total_runs": 0,
+            "max_runs": 0,
+            "extra_runs": 0,
+            "rerun_action": None,
+            "in_run": False,
+        },
+    )
+
+
+def mark_action(name: str):
+    # Called from on_click callbacks, which Streamlit runs just before the
+    # script run they trigger.
+    _stats()["action"] = name
+
+
+def start_run():
+    stats = _stats()
+    stats["total_runs"] += 1
+    if stats["in_run"]:
+        # The previous run never reached finish_run(): it was cut short by
+        # st.rerun() (or a newer event), so this run belongs to the same
+        # interaction.
+        stats["runs"] += 1
+        stats["extra_runs"] += 1
+        stats["rerun_action"] = stats["action"] or "untracked"
+    else:
+        stats["interactions"] += 1
+        stats["runs"] = 1
+    stats["max_runs"] = max(stats["max_runs"], stats["runs"])
+    stats["in_run"] = True
+
+
+def finish_run():
+    stats = _stats()
+    stats["in_run"] = False
+    stats["action"] = None
+
+
+def show_run_stats():
+    if os.getenv("NOVARA_SHOW_RUN_STATS") != "1":
+        return
+    stats = _stats()
+    extra = f" (last: {stats['rerun_action']})" if stats["rerun_action"] else ""
+    st.caption(
+        f"🔁 {stats['total_runs']} script runs / {stats['interactions']} interactions"
+        f" • max {stats['max_runs']} per interaction"
+        f" • {stats['extra_runs']} extra{extra}"
+    )
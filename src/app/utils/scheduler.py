@@ -0,0 +1,116 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from app.utils.ratelimit import TokenBucket
+
+PRIORITIES = {"chat": 0, "why_watch": 1, "summary": 2, "similar": 3}
+MAX_TRACKED_SESSIONS = 1024
+
+
+class SchedulerBusy(Exception):
+    pass
+
+
+class QuotaExceeded(Exception):
+    pass
+
+
+class PriorityScheduler:
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        max_wait: float = 20,
+        session_rate: float = 10 / 60,
+        session_burst: int = 5,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_wait = max_wait
+        self.session_rate = session_rate
+        self.session_burst = session_burst
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.max_depth = 0
+        self._waits: deque = deque(maxlen=500)
+        self._queue: list = []
+        self._sequence = itertools.count()
+        self._quotas: Dict[str, TokenBucket] = {}
+        self._cond = threading.Condition()
+
+    def _take_quota(self, session_id: str):
+        now = time.monotonic()
+        bucket = self._quotas.get(session_id)
+        if bucket is None:
+            if len(self._quotas) >= MAX_TRACKED_SESSIONS:
+                # Full buckets belong to idle sessions and carry no state.
+                for sid, idle in list(self._quotas.items()):
+                    idle.refill(now)
+                    if idle.tokens >= idle.capacity:
+                        del self._quotas[sid]
+            bucket = self._quotas[session_id] = TokenBucket(
+                self.session_rate, self.session_burst
+            )
+
+        bucket.refill(now)
+        if bucket.tokens < 1:
+            self.rejected += 1
+            raise QuotaExceeded(
+                f"AI request limit reached, try again in {bucket.wait_time():.0f}s"
+            )
+        bucket.tokens -= 1
+
+    @contextmanager
+    def slot(self, kind: str, session_id: str = "anonymous") -> Iterator[None]:
+        entry = (PRIORITIES.get(kind, len(PRIORITIES)), next(self._sequence))
+        queued_at = time.monotonic()
+        deadline = queued_at + self.max_wait
+
+        with self._cond:
+            self._take_quota(session_id)
+            heapq.heappush(self._queue, entry)
+            self.max_depth = max(self.max_depth, len(self._queue))
+
+            while not (
+                self._queue[0] == entry and self.running < self.max_concurrency
+            ):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                    self.timed_out += 1
+                    self._cond.notify_all()
+                    raise SchedulerBusy("AI is busy right now, please try again")
+                self._cond.wait(remaining)
+
+            heapq.heappop(self._queue)
+            self.running += 1
+            self._waits.append(time.monotonic() - queued_at)
+            self._cond.notify_all()
+
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.running -= 1
+                self.completed += 1
+                self._cond.notify_all()
+
+    def stats(self) -> Dict[str, float]:
+        with self._cond:
+            waits = sorted(self._waits)
+            return {
+                "running": self.running,
+                "queue_depth": len(self._queue),
+                "max_queue_depth": self.max_depth,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "avg_wait": sum(waits) / len(waits) if waits else 0.0,
+                "p95_wait": waits[int(len(waits) * 0.95)] if waits else 0.0,
+            }
@@ -0,0 +1,109 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        # Set when an async leader was cancelled; followers then retry
+        # instead of failing with the leader's cancellation.
+        self.cancelled = False
+        self.waiters: List = []
+
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class SingleFlight:
+    # Shared by threads (do) and coroutines (do_async), so a sync lookup and
+    # an async fan-out for the same key still make one upstream call.
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._inflight: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key: Hashable):
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._inflight[key] = call
+                self.calls += 1
+            else:
+                self.coalesced += 1
+            return call, leader
+
+    def _finish(self, key: Hashable, call: _Call):
+        with self._lock:
+            del self._inflight[key]
+            call.done.set()
+            waiters, call.waiters = call.waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_wake, future)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        call, leader = self._join(key)
+        if not leader:
+            call.done.wait()
+            if call.cancelled:
+                return self.do(key, fn)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            self._finish(key, call)
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable]) -> Any:
+        call, leader = self._join(key)
+        if not leader:
+            # Woken from whichever thread finishes the call, without holding
+            # an executor thread while waiting.
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            with self._lock:
+                if not call.done.is_set():
+                    call.waiters.append((loop, future))
+                    waiting = True
+                else:
+                    waiting = False
+            if waiting:
+                await future
+            if call.cancelled:
+                return await self.do_async(key, fn)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = await fn()
+            return call.result
+        except asyncio.CancelledError:
+            call.cancelled = True
+            raise
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            self._finish(key, call)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "inflight": len(self._inflight),
+            }
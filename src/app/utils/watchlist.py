@@ -1,7 +1,11 @@
 import streamlit as st
 from datetime import datetime
 import base64
-from typing import Dict
+import uuid
+from typing import Dict, Tuple
+from app.utils.watchlist_store import get_watchlist_store, item_id
+
+OWNER_PARAM = "wl"
 
 
 def create_downloadable_txt(content: str, filename: str) -> str:
@@ -9,38 +13,121 @@ def create_downloadable_txt(content: str, filename: str) -> str:
     return f'<a href="data:file/txt;base64,{b64}" download="{filename}" class="action-button" style="text-decoration: none; display: inline-block; margin: 0.5rem;">📥 Download {filename}</a>'
 
 
-def add_to_watchlist(item: Dict, content_type: str):
-    if "watchlist" not in st.session_state:
-        st.session_state.watchlist = []
+def get_watchlist_owner() -> str:
+    # The owner token lives in the URL, so the watchlist survives reloads and
+    # is shared by every tab opened from the same link.
+    owner = st.query_params.get(OWNER_PARAM)
+    if not owner:
+        owner = uuid.uuid4().hex
+        st.query_params[OWNER_PARAM] = owner
+    return owner
+
 
+def watchlist_counts() -> Dict[str, int]:
+    return get_watchlist_store().counts(get_watchlist_owner())
+
+
+def add_to_watchlist(item: Dict, content_type: str):
     if content_type == "movie":
         watchlist_item = {
             "type": "movie",
+            "id": item.get("imdbID"),
             "title": item.get("Title", "Unknown"),
             "year": item.get("Year", "Unknown"),
             "plot": item.get("Plot", "No plot available"),
             "poster": item.get("Poster", ""),
+            "genre": item.get("Genre", ""),
+            "imdbRating": item.get("imdbRating", "N/A"),
             "added_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         }
     else:
         watchlist_item = {
             "type": "anime",
+            "id": item.get("mal_id"),
             "title": item.get("title", "Unknown"),
             "episodes": item.get("episodes", "Unknown"),
             "synopsis": item.get("synopsis", "No synopsis available"),
             "image": item.get("images", {}).get("jpg", {}).get("image_url", ""),
+            "genres": item.get("genres", []),
+            "year": item.get("year"),
+            "score": item.get("score"),
             "added_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         }
 
-    for existing_item in st.session_state.watchlist:
-        if existing_item["title"] == watchlist_item["title"]:
-            st.warning(f"'{watchlist_item['title']}' is already in your watchlist!")
-            return
+    if not save_to_watchlist(watchlist_item):
+        st.warning(f"'{watchlist_item['title']}' is already in your watchlist!")
+        return
 
-    st.session_state.watchlist.append(watchlist_item)
     st.success(f"✅ Added '{watchlist_item['title']}' to watchlist!")
 
 
+def save_to_watchlist(item: Dict) -> bool:
+    if not get_watchlist_store().add(get_watchlist_owner(), item):
+        return False
+    # Only a profile the For You section already built is kept in step; the
+    # click itself never builds one.
+    profile = st.session_state.get("taste_profile")
+    if profile is not None:
+        profile.add(*watchlist_key(item), watchlist_features(item))
+    return True
+
+
+def remove_from_watchlist(item: Dict) -> bool:
+    key = watchlist_key(item)
+    if not get_watchlist_store().remove(get_watchlist_owner(), *key):
+        return False
+    profile = st.session_state.get("taste_profile")
+    if profile is not None:
+        profile.remove(*key)
+    return True
+
+
+def watchlist_key(item: Dict) -> Tuple[str, str]:
+    return item["type"], item_id(item)
+
+
+def watchlist_features(item: Dict) -> Dict:
+    # The sidebar imports this module on every run; NumPy (via the
+    # recommender) is only loaded once a taste profile is needed.
+    from app.utils.recommender import anime_features, movie_features
+
+    if item["type"] == "movie":
+        return movie_features(
+            {
+                "Title": item["title"],
+                "Plot": item.get("plot", ""),
+                "Genre": item.get("genre", ""),
+                "Year": item.get("year"),
+                "imdbRating": item.get("imdbRating"),
+            }
+        )
+    return anime_features(
+        {
+            "title": item["title"],
+            "synopsis": item.get("synopsis", ""),
+            "genres": item.get("genres", []),
+            "year": item.get("year"),
+            "score": item.get("score"),
+        }
+    )
+
+
+def get_taste_profile():
+    from app.utils.recommender import TasteProfile
+
+    # Built lazily when For You is rendered, then kept in step by
+    # save_to_watchlist / remove_from_watchlist. A size mismatch means another
+    # tab changed the watchlist, so it is rebuilt then.
+    profile = st.session_state.get("taste_profile")
+    if profile is None or len(profile) != sum(watchlist_counts().values()):
+        profile = TasteProfile()
+        items = get_watchlist_store().items(get_watchlist_owner())
+        for item in items:
+            profile.add(*watchlist_key(item), watchlist_features(item))
+        st.session_state.taste_profile = profile
+    return profile
+
+
 def save_movie_info(movie: Dict):
     content = f"""🎬 MOVIE INFORMATION
 {'='*50}
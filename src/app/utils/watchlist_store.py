@@ -0,0 +1,128 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+DEFAULT_WATCHLIST_DB = os.path.join(".novara_data", "watchlist.sqlite3")
+
+SORTS = {
+    "newest": "added_date DESC",
+    "oldest": "added_date ASC",
+    "title": "title COLLATE NOCASE ASC",
+    "title_desc": "title COLLATE NOCASE DESC",
+}
+
+
+def item_id(item: Dict) -> str:
+    # Items saved before ids were stored fall back to their title.
+    return str(item.get("id") or item["title"])
+
+
+class WatchlistStore:
+    # Each owner (one browser, identified by a URL token) has its own rows.
+    # Every write is a single statement, so tabs sharing an owner can't
+    # interleave into duplicates or lost updates.
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS watchlist (
+                    owner TEXT NOT NULL,
+                    type TEXT NOT NULL,
+                    item_id TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    added_date TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (owner, type, item_id)
+                )"""
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS watchlist_added "
+                "ON watchlist (owner, added_date)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS watchlist_type_added "
+                "ON watchlist (owner, type, added_date)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS watchlist_title "
+                "ON watchlist (owner, title COLLATE NOCASE)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def add(self, owner: str, item: Dict) -> bool:
+        cursor = self._connect().execute(
+            "INSERT OR IGNORE INTO watchlist VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                owner,
+                item["type"],
+                item_id(item),
+                item["title"],
+                item["added_date"],
+                json.dumps(item),
+            ),
+        )
+        return cursor.rowcount == 1
+
+    def remove(self, owner: str, kind: str, key: str) -> bool:
+        cursor = self._connect().execute(
+            "DELETE FROM watchlist WHERE owner = ? AND type = ? AND item_id = ?",
+            (owner, kind, str(key)),
+        )
+        return cursor.rowcount == 1
+
+    def counts(self, owner: str) -> Dict[str, int]:
+        rows = self._connect().execute(
+            "SELECT type, COUNT(*) FROM watchlist WHERE owner = ? GROUP BY type",
+            (owner,),
+        )
+        counts = {"movie": 0, "anime": 0}
+        counts.update(dict(rows.fetchall()))
+        return counts
+
+    def items(
+        self,
+        owner: str,
+        kind: Optional[str] = None,
+        sort: str = "newest",
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Dict]:
+        query = "SELECT data FROM watchlist WHERE owner = ?"
+        params: list = [owner]
+        if kind:
+            query += " AND type = ?"
+            params.append(kind)
+        query += f" ORDER BY {SORTS[sort]}"
+        if limit is not None:
+            # The ORDER BY walks an index, so a page only decodes its own rows.
+            query += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        rows = self._connect().execute(query, params).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_watchlist_store() -> WatchlistStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            path = os.getenv("NOVARA_WATCHLIST_DB", DEFAULT_WATCHLIST_DB)
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            _store = WatchlistStore(path)
+        return _store
@@ -8,13 +8,14 @@ Repository: https://github.com/nova-cortex/novara
 import streamlit as st
 from app.utils.api_keys import load_env_variables, check_api_keys
 from app.ui_components.styles import load_css
-from app.ui_components.cards import display_movie_card, display_anime_card
-from app.ui_components.movie_details import display_movie_details
-from app.ui_components.anime_details import display_anime_details
-from app.clients.omdb import OMDBClient
-from app.clients.jikan import JikanClient
-from app.clients.googlegemini import GeminiAI
-from app.ui_components.watchlist_display import display_watchlist
+from app.ui_components.cards import (
+    display_anime_grid,
+    display_movie_grid,
+    display_result_grid,
+)
+from app.clients.shared import get_omdb_client, get_jikan_client, get_gemini_ai
+from app.utils.reruns import finish_run, show_run_stats, start_run
+from app.utils.watchlist import watchlist_counts
 
 load_env_variables()
 
@@ -39,9 +40,8 @@ def main():
         return
 
     try:
-        omdb_client = OMDBClient()
-        jikan_client = JikanClient()
-        gemini_ai = GeminiAI()
+        omdb_client = get_omdb_client()
+        jikan_client = get_jikan_client()
     except Exception as e:
         st.error(f"Error initializing services: {e}")
         return
@@ -52,29 +52,23 @@ def main():
 
         if page == "🔍 Search":
             st.markdown("### Search Options")
-            content_type = st.radio("Content Type:", ["🎬 Movies", "🎌 Anime"])
+            content_type = st.radio(
+                "Content Type:", ["🎬 Movies", "🎌 Anime", "🌐 All"]
+            )
 
             if content_type == "🎬 Movies":
                 st.session_state.search_type = "movies"
-            else:
+            elif content_type == "🎌 Anime":
                 st.session_state.search_type = "anime"
+            else:
+                st.session_state.search_type = "all"
 
-        if "watchlist" not in st.session_state:
-            st.session_state.watchlist = []
-
-        if "watchlist" in st.session_state:
-            st.markdown("### 📊 Your Stats")
-            total_items = len(st.session_state.watchlist)
-            movies_count = len(
-                [item for item in st.session_state.watchlist if item["type"] == "movie"]
-            )
-            anime_count = len(
-                [item for item in st.session_state.watchlist if item["type"] == "anime"]
-            )
-
-            st.markdown(f"**Total Items:** {total_items}")
-            st.markdown(f"**Movies:** {movies_count}")
-            st.markdown(f"**Anime:** {anime_count}")
+        st.markdown("### 📊 Your Stats")
+        counts = watchlist_counts()
+        st.markdown(f"**Total Items:** {sum(counts.values())}")
+        st.markdown(f"**Movies:** {counts['movie']}")
+        st.markdown(f"**Anime:** {counts['anime']}")
+        show_run_stats()
 
     if page == "🔍 Search":
         st.markdown('<div class="search-container">', unsafe_allow_html=True)
@@ -92,11 +86,14 @@ def main():
             )
         with col2:
             if st.button("🔄 Clear Results", help="Clear current search results"):
+                if st.session_state.get("prefetch"):
+                    st.session_state.prefetch.cancel()
                 for key in [
                     "search_results",
                     "selected_movie",
                     "selected_anime",
                     "show_ai_features",
+                    "prefetch",
                 ]:
                     if key in st.session_state:
                         del st.session_state[key]
@@ -104,55 +101,92 @@ def main():
 
         st.markdown("</div>", unsafe_allow_html=True)
 
+        streamed = False
         if search_button and search_query:
-            with st.spinner("🔍 Searching..."):
-                if st.session_state.get("search_type") == "movies":
-                    results = omdb_client.search_movies(search_query)
+            if st.session_state.get("prefetch"):
+                st.session_state.prefetch.cancel()
+                del st.session_state["prefetch"]
+
+            if st.session_state.get("search_type") == "movies":
+                st.session_state.search_results = results = []
+                st.session_state.result_type = "movies"
+                seen = set()
+                header = st.empty()
+
+                with st.spinner("🔍 Searching..."):
+                    for page in omdb_client.search_movies_paged(search_query):
+                        fresh = [m for m in page if m.get("imdbID") not in seen]
+                        seen.update(m.get("imdbID") for m in fresh)
+                        results.extend(fresh)
+                        if results:
+                            header.markdown(
+                                f"### 📋 Search Results ({len(results)} found)\n\n"
+                                "**🎬 Showing Movies**"
+                            )
+                        display_movie_grid(fresh)
+
+                st.session_state.prefetch = omdb_client.prefetch_details(results)
+                streamed = bool(results)
+            elif st.session_state.get("search_type") == "all":
+                from app.clients.unified import UnifiedSearch
+
+                with st.spinner("🔍 Searching movies and anime..."):
+                    results, errors = UnifiedSearch(
+                        omdb_client, jikan_client
+                    ).search_all(search_query)
+                    for error in errors:
+                        st.error(error)
                     st.session_state.search_results = results
-                    st.session_state.result_type = "movies"
-                else:
+                    st.session_state.result_type = "all"
+            else:
+                with st.spinner("🔍 Searching..."):
                     results = jikan_client.search_anime(search_query)
                     st.session_state.search_results = results
                     st.session_state.result_type = "anime"
 
-                if results:
-                    st.success(f"✅ Found {len(results)} results!")
-                else:
-                    st.warning(
-                        "😞 No results found. Try different keywords or check spelling."
-                    )
+            if results:
+                st.success(f"✅ Found {len(results)} results!")
+            else:
+                st.warning(
+                    "😞 No results found. Try different keywords or check spelling."
+                )
 
-        if st.session_state.get("search_results"):
+        if st.session_state.get("search_results") and not streamed:
             st.markdown(
                 f"### 📋 Search Results ({len(st.session_state.search_results)} found)"
             )
 
-            result_emoji = (
-                "🎬" if st.session_state.get("result_type") == "movies" else "🎌"
-            )
-            result_type_name = (
-                "Movies" if st.session_state.get("result_type") == "movies" else "Anime"
-            )
+            result_emoji, result_type_name = {
+                "movies": ("🎬", "Movies"),
+                "anime": ("🎌", "Anime"),
+                "all": ("🌐", "Movies & Anime"),
+            }[st.session_state.get("result_type", "movies")]
             st.markdown(f"**{result_emoji} Showing {result_type_name}**")
 
             if st.session_state.get("result_type") == "movies":
-                for movie in st.session_state.search_results:
-                    display_movie_card(movie)
+                display_movie_grid(st.session_state.search_results)
+            elif st.session_state.get("result_type") == "all":
+                display_result_grid(st.session_state.search_results)
             else:
-                for anime in st.session_state.search_results:
-                    display_anime_card(anime)
+                display_anime_grid(st.session_state.search_results)
 
         if st.session_state.get("selected_movie"):
+            from app.ui_components.movie_details import display_movie_details
+
             display_movie_details(
-                st.session_state.selected_movie, omdb_client, gemini_ai
+                st.session_state.selected_movie, omdb_client, get_gemini_ai()
             )
 
         if st.session_state.get("selected_anime"):
+            from app.ui_components.anime_details import display_anime_details
+
             display_anime_details(
-                st.session_state.selected_anime, jikan_client, gemini_ai
+                st.session_state.selected_anime, jikan_client, get_gemini_ai()
             )
 
     elif page == "📚 Watchlist":
+        from app.ui_components.watchlist_display import display_watchlist
+
         display_watchlist()
 
     st.markdown(
@@ -168,10 +202,11 @@ def main():
 
 
 if __name__ == "__main__":
-    if "watchlist" not in st.session_state:
-        st.session_state.watchlist = []
-
     if "search_type" not in st.session_state:
         st.session_state.search_type = "movies"
 
+    start_run()
     main()
+    # Not reached when the run is cut short by st.rerun(), which is what the
+    # run counter relies on.
+    finish_run()